@@ -0,0 +1,202 @@
+"""
+pipeline.py
+
+Time and memory-profile each stage of the pipeline on synthetic data,
+and compare them against stored baselines.
+
+python -m benchmarks.pipeline [--rows 1000 100000 ...] [--save] [--threshold 1.5]
+
+The shape of the synthetic data is set with --authors, --countries,
+--interventions, --scenarios and --duplicates. Baselines are only
+comparable for data of the same shape, so they are keyed by every one
+of these, along with the number of rows.
+
+Each stage is timed as the best of --repeat runs, then run once more
+under tracemalloc for its peak allocated memory. With --save,
+the results become the baselines, otherwise any stage slower, or
+heavier, than its baseline by more than the threshold is reported,
+and the exit code is 1.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from src.botech_comparisons import create_tables, parse_configuration
+from src.botech_comparisons.comparisons import create_comparisons
+from src.botech_comparisons.convert import convert_elements_to_format
+from src.botech_comparisons.countries import resolver
+from src.botech_comparisons.groups import group_elements
+from src.botech_comparisons.records import create_records, filter_records
+from .synthetic import generate_data
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+SIZES = [10**3, 10**4, 10**5]
+CONFIGURATION = {
+    "data_type": "comparisons",
+    "data_format": "csv",
+    "scenarios": [0, 1],
+    "filters": {"intervention": list(range(150))},
+    "groups": [["region"], ["income", "region"]],
+}
+
+
+def configuration(number_of_scenarios: int = 2) -> dict:
+    """
+    The benchmark configuration, over scenarios 0 to number_of_scenarios - 1.
+    Beyond two, scenario 0 is compared with each of the others.
+    """
+    if number_of_scenarios < 2:
+        raise ValueError("At least two scenarios are needed to compare them")
+    scenarios = list(range(number_of_scenarios))
+    if number_of_scenarios == 2:
+        return {**CONFIGURATION, "scenarios": scenarios}
+    return {**CONFIGURATION, "scenarios": scenarios, "pairing": "reference"}
+
+
+def _measure(stage: Callable[[], object], repeat: int) -> Tuple[object, dict]:
+    "Return the result of a stage, its best time, and its peak memory."
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = stage()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"seconds": seconds, "peak_bytes": peak}
+
+
+def run(
+    number_of_rows: int,
+    repeat: int = 3,
+    number_of_scenarios: int = 2,
+    **generator
+) -> Dict[str, dict]:
+    """
+    Measure every stage, each fed by the result of the one before.
+    The generator arguments are passed on to generate_data.
+    """
+    benchmark = configuration(number_of_scenarios)
+    _, _, scenarios, filters, groups = parse_configuration(benchmark)
+    pairing = benchmark.get("pairing")
+    data = generate_data(number_of_rows, scenarios=scenarios, **generator)
+
+    results = {}
+    records, results["create_records"] = _measure(
+        lambda: create_records(data), repeat
+    )
+    filtered_records, results["filter_records"] = _measure(
+        lambda: filter_records(records, scenarios, filters), repeat
+    )
+    comparisons, results["create_comparisons"] = _measure(
+        lambda: create_comparisons(filtered_records, scenarios, pairing), repeat
+    )
+    _, results["group_elements"] = _measure(
+        lambda: group_elements(groups, comparisons), repeat
+    )
+    _, results["convert_elements_to_format"] = _measure(
+        lambda: convert_elements_to_format(comparisons, "csv", "csv"), repeat
+    )
+    _, results["create_tables"] = _measure(
+        lambda: create_tables(benchmark, data), repeat
+    )
+    return results
+
+
+def shape_key(number_of_rows: int, **generator) -> str:
+    "The key of the baselines of data of this shape."
+    return ", ".join(
+        [f"{number_of_rows} rows"]
+        + [f"{value} {name}" for name, value in sorted(generator.items())]
+    )
+
+
+def compare(
+    results: Dict[str, Dict[str, dict]],
+    baselines: Dict[str, Dict[str, dict]],
+    threshold: float
+) -> List[str]:
+    "Describe every measurement which exceeds its baseline by more than the threshold."
+    regressions = []
+    for size, stages in results.items():
+        for stage, measurements in stages.items():
+            baseline = baselines.get(size, {}).get(stage)
+            if baseline is None:
+                continue
+            for measurement, value in measurements.items():
+                if value > baseline[measurement] * threshold:
+                    regressions.append(
+                        f"{size}, {stage}: {measurement} "
+                        f"{value:.4g} > {threshold} x {baseline[measurement]:.4g}"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--authors", type=int, default=10)
+    parser.add_argument("--countries", type=int, default=100)
+    parser.add_argument("--interventions", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.1)
+    parser.add_argument(
+        "--scenarios",
+        type=int,
+        default=2,
+        help="number of scenarios, beyond two each is compared with the first"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=1.5)
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--save", action="store_true", help="store the results as the baselines")
+    args = parser.parse_args()
+
+    resolver.warm_up()
+    results = {}
+    generator = {
+        "authors": args.authors,
+        "countries": args.countries,
+        "interventions": args.interventions,
+        "duplicates": args.duplicates,
+    }
+    print(f"{'rows':>10} {'stage':<28}{'seconds':>10}{'peak MiB':>10}")
+    for number_of_rows in args.rows:
+        size = shape_key(number_of_rows, scenarios=args.scenarios, **generator)
+        results[size] = run(number_of_rows, args.repeat, args.scenarios, **generator)
+        for stage, measurements in results[size].items():
+            print(
+                f"{number_of_rows:>10} {stage:<28}"
+                f"{measurements['seconds']:>10.4f}"
+                f"{measurements['peak_bytes'] / 2**20:>10.1f}"
+            )
+
+    if args.save:
+        baselines = {}
+        if os.path.exists(args.baselines):
+            with open(args.baselines) as f:
+                baselines = json.load(f)
+        baselines.update(results)
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"saved baselines to {args.baselines}")
+        return
+
+    if not os.path.exists(args.baselines):
+        print("no baselines to compare against, run with --save first")
+        return
+    with open(args.baselines) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
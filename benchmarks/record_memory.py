@@ -0,0 +1,119 @@
+"""
+record_memory.py
+
+Measure the memory held by each Record and Comparison,
+against plain dataclasses with a __dict__ and unshared strings.
+
+python -m benchmarks.record_memory [number_of_records]
+"""
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Optional
+from src.botech_comparisons.countries import resolver
+from src.botech_comparisons.datatypes import Comparison, Record
+
+COUNTRIES = ["BR", "MZ", "US", "CN", "IN", "NG", "ID", "FR"]
+
+
+@dataclass
+class PlainRecord:
+    AUTHOR: str
+    COUNTRY: str
+    INTERVENTION: str
+    SCENARIO: str
+    TIMESTAMP: str
+    EFFECTS: float
+    COSTS: float
+    REGION: str = field(init=False)
+    INCOME: str = field(init=False)
+    APPENDIX_3: str = field(init=False)
+    UID: Optional[str] = None
+
+    def __post_init__(self):
+        self.REGION, self.INCOME, self.APPENDIX_3 = resolver.get_tags(self.COUNTRY)
+
+
+@dataclass
+class PlainComparison:
+    SCENARIO_ONE: PlainRecord
+    SCENARIO_TWO: PlainRecord
+    NET_EFFECTS: float = field(init=False)
+    NET_COSTS: float = field(init=False)
+    COST_EFFECTIVENESS: float = field(init=False)
+
+    def __post_init__(self):
+        self.NET_EFFECTS = self.SCENARIO_TWO.EFFECTS - self.SCENARIO_ONE.EFFECTS
+        self.NET_COSTS = self.SCENARIO_TWO.COSTS - self.SCENARIO_ONE.COSTS
+        if self.NET_COSTS != 0:
+            self.COST_EFFECTIVENESS = self.NET_EFFECTS / self.NET_COSTS
+        else:
+            self.COST_EFFECTIVENESS = float('inf')
+
+
+def _rows(number_of_records: int, scenario: str):
+    "Rows as a CSV parser would produce them, with a new string for every cell."
+    for i in range(number_of_records):
+        yield (
+            "".join(["author_", str(i % 7)]),
+            "".join(COUNTRIES[i % len(COUNTRIES)]),
+            "".join(["intervention_", str(i % 311)]),
+            "".join(["scenario_", scenario]),
+            "2023-10-02",
+            float(i),
+            float(i) + 1.0,
+        )
+
+
+def _measure(build, number_of_records: int) -> float:
+    "Return the bytes held per element built."
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    elements = build(number_of_records)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(elements) == number_of_records
+    return (after - before) / number_of_records
+
+
+def _build_records(record_type):
+    def build(number_of_records):
+        return [record_type(*row) for row in _rows(number_of_records, "one")]
+    return build
+
+
+def _build_comparisons(record_type, comparison_type):
+    def build(number_of_records):
+        return [
+            comparison_type(record_type(*one), record_type(*two))
+            for one, two in zip(
+                _rows(number_of_records, "one"),
+                _rows(number_of_records, "two")
+            )
+        ]
+    return build
+
+
+def main():
+    number_of_records = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    resolver.warm_up()
+
+    results = {
+        "Record": (
+            _measure(_build_records(PlainRecord), number_of_records),
+            _measure(_build_records(Record), number_of_records),
+        ),
+        "Comparison": (
+            _measure(_build_comparisons(PlainRecord, PlainComparison), number_of_records),
+            _measure(_build_comparisons(Record, Comparison), number_of_records),
+        ),
+    }
+
+    print(f"bytes per element, {number_of_records} elements")
+    print(f"{'':<12}{'before':>10}{'after':>10}{'saved':>8}")
+    for name, (before, after) in results.items():
+        print(f"{name:<12}{before:>10.0f}{after:>10.0f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
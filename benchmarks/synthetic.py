@@ -0,0 +1,81 @@
+"""
+synthetic.py
+
+Generate data with the schema of a Record, at any size.
+
+Every model, i.e. AUTHOR, COUNTRY and INTERVENTION, is run for
+each scenario, and a share of those runs are repeated with a later
+TIMESTAMP, as when a model is rerun.
+
+python -m benchmarks.synthetic number_of_rows output.csv
+"""
+import sys
+import numpy as np
+import pandas as pd
+from typing import Sequence
+from src.botech_comparisons.countries import resolver
+
+
+def generate_data(
+    number_of_rows: int,
+    authors: int = 10,
+    countries: int = 100,
+    interventions: int = 200,
+    scenarios: Sequence = (0, 1),
+    duplicates: float = 0.1,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Return number_of_rows rows, drawn from the product of the
+    authors, countries, interventions and scenarios.
+
+    duplicates is the share of rows which rerun a model and scenario
+    already in the data, with a later TIMESTAMP.
+    Countries are the first known alpha2 codes, so they have tags.
+    """
+    rng = np.random.default_rng(seed)
+    country_codes = np.array(sorted(resolver.all_countries())[:countries], dtype=object)
+    scenarios = np.array(list(scenarios))
+
+    number_of_reruns = int(number_of_rows * duplicates)
+    number_of_runs = number_of_rows - number_of_reruns
+    # Whole models, so each is run for every scenario
+    models = rng.integers(
+        0,
+        authors * len(country_codes) * interventions,
+        size=-(-number_of_runs // len(scenarios))
+    )
+    model = np.repeat(models, len(scenarios))[:number_of_runs]
+    scenario = np.tile(np.arange(len(scenarios)), len(models))[:number_of_runs]
+    if number_of_reruns:
+        reruns = rng.integers(0, number_of_runs, size=number_of_reruns)
+        model = np.concatenate([model, model[reruns]])
+        scenario = np.concatenate([scenario, scenario[reruns]])
+    days = np.concatenate([
+        rng.integers(0, 365, size=number_of_runs),
+        rng.integers(365, 730, size=number_of_reruns),
+    ])
+
+    author, rest = np.divmod(model, len(country_codes) * interventions)
+    country, intervention = np.divmod(rest, interventions)
+    effects = rng.gamma(2.0, 1000.0, size=number_of_rows).round(2)
+    return pd.DataFrame({
+        "AUTHOR": author,
+        "COUNTRY": country_codes[country],
+        "INTERVENTION": intervention,
+        "SCENARIO": scenarios[scenario],
+        "TIMESTAMP": (
+            np.datetime64("2022-01-01") + days.astype("timedelta64[D]")
+        ).astype(str),
+        "EFFECTS": effects,
+        "COSTS": (effects * rng.uniform(0.5, 50.0, size=number_of_rows)).round(2),
+    })
+
+
+def main():
+    number_of_rows = int(sys.argv[1])
+    generate_data(number_of_rows).to_csv(sys.argv[2], index=False)
+
+
+if __name__ == "__main__":
+    main()
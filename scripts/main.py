@@ -3,28 +3,61 @@ main.py
 
 Run the main API
 """
-from src.botech_comparisons import create_tables
-import sys
+from src.botech_comparisons import PipelineStats, create_tables
+from src.botech_comparisons.ingest import DEFAULT_CHUNKSIZE
+import argparse
 import json
-import pandas as pd
 import pprint
+import sys
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Create tables of results.")
+    parser.add_argument("configuration_filepath")
+    parser.add_argument("data_filepath")
+    parser.add_argument("data_type")
+    parser.add_argument("data_format")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help="Number of rows of the data file to read at a time."
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory to cache the parsed data file in, between runs."
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Number of processes to create the records and comparisons on."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time, rows and peak memory of each stage."
+    )
+    return parser.parse_args()
 
 
 def main():
-    configuration_filepath = sys.argv[1]
-    mock_data_filepath = sys.argv[2]
-    data_type = sys.argv[3]
-    data_format = sys.argv[4]
+    arguments = parse_arguments()
 
-    with open(configuration_filepath) as f:
+    with open(arguments.configuration_filepath) as f:
         configuration = json.load(f)
-    configuration["data_type"] = data_type
-    configuration["data_format"] = data_format
-
-    df = pd.read_csv(mock_data_filepath, keep_default_na=False)
+    configuration["data_type"] = arguments.data_type
+    configuration["data_format"] = arguments.data_format
+    configuration["chunksize"] = arguments.chunksize
+    configuration["cache_directory"] = arguments.cache_dir
+    configuration["shards"] = arguments.shards
 
-    foo = create_tables(configuration, df)
+    stats = PipelineStats() if arguments.profile else None
+    foo = create_tables(configuration, arguments.data_filepath, stats=stats)
     pprint.pprint(foo)
+    if stats is not None:
+        print(stats.report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
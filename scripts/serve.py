@@ -0,0 +1,69 @@
+"""
+serve.py
+
+Serve tables of a data file over a local socket, e.g.
+
+python -m scripts.serve data.csv --port 8765
+echo '{"data_type": "comparisons", "data_format": "csv", "scenarios": [0, 1]}' | nc localhost 8765
+"""
+from src.botech_comparisons.cache import ResultCache
+from src.botech_comparisons.ingest import DEFAULT_CHUNKSIZE
+from src.botech_comparisons.server import DEFAULT_HOST, DEFAULT_PORT, TableServer
+import argparse
+import asyncio
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Serve tables of results.")
+    parser.add_argument("data_filepath")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="Listen on a Unix socket at this path, instead of host and port."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of threads to create tables on."
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between checks of the data file for changes."
+    )
+    parser.add_argument(
+        "--cache-entries",
+        type=int,
+        default=128,
+        help="Number of results to keep in memory."
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help="Number of rows of the data file to read at a time."
+    )
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    server = TableServer(
+        arguments.data_filepath,
+        cache=ResultCache(max_entries=arguments.cache_entries),
+        workers=arguments.workers,
+        poll_interval=arguments.poll_interval,
+        chunksize=arguments.chunksize
+    )
+    try:
+        asyncio.run(server.serve(arguments.host, arguments.port, arguments.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
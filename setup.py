@@ -5,6 +5,8 @@ setup(
     version='0.1.0',
     package_dir={'': 'src'},
     packages=find_packages(where='src'),
+    python_requires='>=3.10',
+    extras_require={'arrow': ['pyarrow']},
     license='Apache 2.0',
     description='Compare results',
     long_description=open('README.md').read(),
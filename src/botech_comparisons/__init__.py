@@ -3,38 +3,332 @@ botech_comparisons.py
 
 Compare model runs from arbitrary lists of summarised results.
 """
+import os
 import pandas as pd
-from typing import Tuple, List, Optional
+from typing import Dict, FrozenSet, Hashable, Iterator, Tuple, List, Optional, Union
 from .datatypes import Filter
 from .convert import (
     convert_elements_to_format,
+    convert_groups_to_format,
 )
 from .blueprint import (
     create_blueprint,
+    find_missing,
+    group_missing,
 )
 from .records import (
     create_records,
-    filter_records
+    filter_records,
+    select_latest_records,
 )
 from .comparisons import (
     create_comparisons,
 )
+from .cache import (
+    MISSING,
+    RecordCache,
+    ResultCache,
+    _copy,
+    data_fingerprint,
+)
+from .summaries import (
+    summarise_groups,
+)
 from .groups import (
-    group_elements
+    group_elements,
+    iter_grouped_elements,
+)
+from .incremental import (
+    IncrementalTables,
+)
+from .ingest import (
+    DEFAULT_CHUNKSIZE,
+    read_records,
+)
+from .profiling import (
+    PipelineStats,
+    measure,
+)
+from .sharded import (
+    create_sharded_elements,
+)
+from .sinks import (
+    write_elements_to_directory,
+    write_elements_to_zip,
+)
+from .tables import (
+    ComparisonTable,
+    RecordTable,
 )
 
+OPTIONS = {
+    "include_empty_groups": False,
+    "chunksize": DEFAULT_CHUNKSIZE,
+    "cache_directory": None,
+    "latest_only": False,
+    "workers": 1,
+    "executor": "process",
+    "pairing": None,
+    "rollup": False,
+    "shards": 1,
+}
+# Options which change how a result is computed, but not the result
+EXECUTION_OPTIONS = {"chunksize", "cache_directory", "workers", "executor", "shards"}
+
 
 def create_tables(
     configuration: dict,
-    data: pd.DataFrame
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike],
+    cache: Optional[ResultCache] = None,
+    fingerprint: Optional[str] = None,
+    stats: Optional[PipelineStats] = None
 ):
     """
     High level API.
 
     Parses a configuration file,
-    generates desired elements: records, comparisons
+    generates desired elements: records, comparisons, summaries
     returns them as a particular format.
+
+    The data is either a DataFrame, or the path to a CSV file,
+    which is streamed in chunks of the configured chunksize,
+    or a RecordTable already loaded, e.g. by read_records.
+
+    With a ResultCache, results are cached by configuration and data,
+    and so are the elements, which configurations that differ only
+    in their format or groups share. The data is identified
+    by its fingerprint, computed by data_fingerprint if not given.
+
+    With PipelineStats, the wall time, rows and peak memory
+    of each stage are recorded in it.
+    """
+    if cache is not None:
+        return _create_tables_cached(configuration, data, cache, fingerprint, stats)
+    elements, groups, options = _prepare_elements(configuration, data, stats)
+    return _render(
+        elements, groups, configuration["data_format"], options,
+        configuration["data_type"], stats
+    )
+
+
+def iter_elements(
+    configuration: dict,
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike]
+) -> Iterator[Tuple[str, Union[RecordTable, ComparisonTable]]]:
+    """
+    Yield (key, elements) for each table create_tables would return,
+    before the elements are converted to a format.
+
+    Without groups, a single table is yielded, keyed by its data type.
+    Otherwise the elements of each table are only gathered as it is yielded.
+    Summaries are yielded as a table for each group.
+    """
+    elements, groups, options = _prepare_elements(configuration, data)
+    if configuration["data_type"] == "summaries":
+        yield from summarise_groups(elements, groups, options["rollup"]).items()
+        return
+    if not groups:
+        yield configuration["data_type"], elements
+        return
+    for broad_label, narrow_label, cell in iter_grouped_elements(
+        groups,
+        elements,
+        include_empty=options["include_empty_groups"],
+        rollup=options["rollup"]
+    ):
+        yield f"{broad_label}_{narrow_label}", cell
+
+
+def iter_tables(
+    configuration: dict,
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike]
+) -> Iterator[Tuple[str, object]]:
+    """
+    Yield (key, table) as each table is converted,
+    rather than holding every table in memory like create_tables.
+    """
+    data_format = configuration["data_format"]
+    for key, elements in iter_elements(configuration, data):
+        yield key, convert_elements_to_format(
+            elements=elements,
+            format=data_format,
+            annotation=data_format
+        )
+
+
+def write_tables(
+    configuration: dict,
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike],
+    destination: Union[str, os.PathLike]
+) -> List[str]:
+    """
+    Stream each table to a file, as soon as it is created.
+
+    A destination ending in .zip is written as a zip archive,
+    anything else as a directory. The data_format must be csv or html.
+    Returns the files written.
+    """
+    data_format = configuration["data_format"]
+    elements_by_key = iter_elements(configuration, data)
+    if str(destination).endswith(".zip"):
+        return write_elements_to_zip(elements_by_key, destination, data_format)
+    return write_elements_to_directory(elements_by_key, destination, data_format)
+
+
+def create_tables_many(
+    configurations: Union[List[dict], Dict[Hashable, dict]],
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike],
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    cache_directory: Optional[Union[str, os.PathLike]] = None
+) -> Dict[Hashable, Union[dict, object]]:
     """
+    Evaluate many configurations against the same data.
+
+    The data is parsed and enriched once. Configurations which share
+    scenarios and filters share their filtered records and comparisons,
+    and those which also share groups share their grouped elements.
+
+    Returns the result of each configuration, keyed by its position
+    in a list of configurations, or by its key in a dict of them.
+    """
+    if isinstance(configurations, dict):
+        items = list(configurations.items())
+    else:
+        items = list(enumerate(configurations))
+
+    parsed = [
+        (key, parse_configuration(configuration), parse_options(configuration))
+        for key, configuration in items
+    ]
+    all_scenarios = tuple(dict.fromkeys(
+        scenario
+        for _, (_, _, scenarios, _, _), _ in parsed
+        for scenario in scenarios
+    ))
+    records = _load_records(
+        data,
+        all_scenarios,
+        None,
+        {"chunksize": chunksize, "cache_directory": cache_directory}
+    )
+
+    selections = {}
+    all_elements = {}
+    all_grouped_elements = {}
+    results = {}
+    for key, (data_type, data_format, scenarios, filters, groups), options in parsed:
+        filters_key = (scenarios, _filters_key(filters))
+        if filters_key not in selections:
+            selections[filters_key] = filter_records(records, scenarios, filters)
+        remove_unpaired = data_type in ("comparisons", "summaries")
+        selection_key = filters_key + (
+            options["latest_only"],
+            options["pairing"],
+            remove_unpaired,
+        )
+        if selection_key not in selections:
+            selections[selection_key] = _select_latest(
+                selections[filters_key], data_type, scenarios, options
+            )
+        # Summaries are made from the same comparisons as comparisons are
+        elements_key = selection_key + ("comparisons" if remove_unpaired else "records",)
+        if elements_key not in all_elements:
+            all_elements[elements_key] = _create_elements(
+                selections[selection_key], data_type, scenarios, options
+            )
+        elements = all_elements[elements_key]
+        if data_type == "summaries":
+            results[key] = _render(elements, groups, data_format, options, data_type)
+            continue
+        groups_key = (
+            elements_key,
+            _groups_key(groups),
+            options["include_empty_groups"],
+            options["rollup"],
+        )
+        if groups_key not in all_grouped_elements:
+            all_grouped_elements[groups_key] = _group_elements(
+                elements, groups, options
+            )
+        results[key] = _format_elements(
+            elements, all_grouped_elements[groups_key], data_format, options
+        )
+    return results
+
+
+def create_coverage_report(
+    configuration: dict,
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike]
+) -> Union[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    Report the records of the blueprint which are absent from the data,
+    as "missing" models, or "unpaired" ones which lack a scenario.
+
+    With groups, the absent records are keyed like the tables of
+    create_tables, and only the tables with absent records appear.
+    A finished batch of model runs has nothing to report.
+    """
+    _, _, scenarios, filters, groups = parse_configuration(configuration)
+    options = parse_options(configuration)
+    records = _load_records(data, scenarios, filters, options)
+    missing = find_missing(records.df, scenarios, filters)
+    if not groups:
+        return missing
+    return group_missing(missing, groups)
+
+
+def _create_tables_cached(
+    configuration: dict,
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike],
+    cache: ResultCache,
+    fingerprint: Optional[str],
+    stats: Optional[PipelineStats]
+):
+    (
+        data_type,
+        data_format,
+        scenarios,
+        filters,
+        groups,
+    ) = parse_configuration(configuration)
+    options = parse_options(configuration)
+    if fingerprint is None:
+        fingerprint = data_fingerprint(data)
+
+    selection_key = (
+        fingerprint,
+        scenarios,
+        _filters_key(filters),
+        options["latest_only"],
+        options["pairing"],
+        data_type,
+    )
+    result_key = (
+        "tables",
+        selection_key,
+        data_format,
+        _groups_key(groups),
+        _options_key(options),
+    )
+    result = cache.get(result_key, MISSING)
+    if result is not MISSING:
+        return result
+
+    def create():
+        return _build_elements(data, data_type, scenarios, filters, options, stats)
+
+    elements = cache.get_or_create(("elements",) + selection_key, create)
+    result = _render(elements, groups, data_format, options, data_type, stats)
+    cache.put(result_key, result)
+    return _copy(result)
+
+
+def _prepare_elements(
+    configuration: dict,
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike],
+    stats: Optional[PipelineStats] = None
+) -> Tuple[Union[RecordTable, ComparisonTable], Optional[List[List[Filter]]], dict]:
+    "Run every stage of a configuration up to, but not including, grouping."
     (
         data_type,
         data_format,
@@ -42,33 +336,245 @@ def create_tables(
         filters,
         groups,
     ) = parse_configuration(configuration)
+    options = parse_options(configuration)
+    elements = _build_elements(data, data_type, scenarios, filters, options, stats)
+    return elements, groups, options
+
+
+def _build_elements(
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike],
+    data_type: str,
+    scenarios: Tuple[str],
+    filters: Optional[Dict[Filter, List[str]]],
+    options: dict,
+    stats: Optional[PipelineStats] = None
+) -> Union[RecordTable, ComparisonTable]:
+    rows = len(data) if isinstance(data, (pd.DataFrame, RecordTable)) else None
+    if options["shards"] > 1:
+        return _build_sharded_elements(data, data_type, scenarios, filters, options, stats)
+    # Filters are pushed down, so other rows never become records
+    with measure(stats, "records", rows) as stage:
+        filtered_records = _load_records(data, scenarios, filters, options)
+        stage.rows_out = len(filtered_records)
+    if options["latest_only"]:
+        with measure(stats, "select_latest", len(filtered_records)) as stage:
+            filtered_records = _select_latest(
+                filtered_records, data_type, scenarios, options
+            )
+            stage.rows_out = len(filtered_records)
+    with measure(stats, data_type, len(filtered_records)) as stage:
+        elements = _create_elements(filtered_records, data_type, scenarios, options)
+        stage.rows_out = len(elements)
+    return elements
+
+
+def _render(
+    elements: Union[RecordTable, ComparisonTable],
+    groups: Optional[List[List[Filter]]],
+    data_format: str,
+    options: dict,
+    data_type: str,
+    stats: Optional[PipelineStats] = None
+):
+    """
+    Group the elements, if there are groups, and convert them to the format.
+    Summaries are summarised by each group instead.
+    """
+    if data_type == "summaries":
+        return _render_summaries(elements, groups, data_format, options, stats)
+    rows = len(elements)
+    if groups:
+        with measure(stats, "group", rows) as stage:
+            grouped_elements = _group_elements(elements, groups, options)
+            # A row is in one cell of every group, and of each of its subtotals
+            rows = stage.rows_out = sum(
+                len(cell)
+                for cells in grouped_elements.values()
+                for cell in cells.values()
+            )
+    else:
+        grouped_elements = None
+    with measure(stats, "format", rows) as stage:
+        result = _format_elements(elements, grouped_elements, data_format, options)
+        stage.rows_out = rows
+    return result
+
+
+def _filters_key(
+    filters: Optional[Dict[Filter, List[str]]]
+) -> FrozenSet:
+    "A hashable form of filters, which ignores the order of their values."
+    if not filters:
+        return frozenset()
+    return frozenset(
+        (filter, frozenset(values))
+        for filter, values in filters.items()
+    )
+
+
+def _groups_key(
+    groups: Optional[List[List[Filter]]]
+) -> Tuple[Tuple[Filter, ...], ...]:
+    "A hashable form of groups."
+    return tuple(tuple(arrangement) for arrangement in groups or [])
+
+
+def _options_key(options: dict) -> Tuple:
+    "A hashable form of the options which change a result."
+    return tuple(
+        (option, repr(value))
+        for option, value in sorted(options.items())
+        if option not in EXECUTION_OPTIONS
+    )
+
 
-    records = create_records(data)
-    filtered_records = filter_records(records, scenarios, filters)
+def _build_sharded_elements(
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike],
+    data_type: str,
+    scenarios: Tuple[str],
+    filters: Optional[Dict[Filter, List[str]]],
+    options: dict,
+    stats: Optional[PipelineStats] = None
+) -> Union[RecordTable, ComparisonTable]:
+    "Build the elements on a process for each shard of the models."
+    if not isinstance(data, (pd.DataFrame, RecordTable)):
+        # Files are read, filtered and enriched as they stream in
+        with measure(stats, "records") as stage:
+            data = _load_records(data, scenarios, filters, options)
+            stage.rows_out = len(data)
+    with measure(stats, "shards", len(data)) as stage:
+        elements = create_sharded_elements(
+            data,
+            data_type,
+            scenarios,
+            filters,
+            options["latest_only"],
+            options["pairing"],
+            options["shards"]
+        )
+        stage.rows_out = len(elements)
+    return elements
+
+
+def _load_records(
+    data: Union[pd.DataFrame, RecordTable, str, os.PathLike],
+    scenarios: Tuple[str],
+    filters: Optional[Dict[Filter, List[str]]],
+    options: dict
+) -> RecordTable:
+    """
+    Load the records matching the scenarios and filters.
+
+    With a cache_directory, every record of a data file is cached,
+    and the scenarios and filters are applied to the cached table.
+    """
+    if isinstance(data, RecordTable):
+        return filter_records(data, scenarios, filters)
+    if isinstance(data, pd.DataFrame):
+        return create_records(data, scenarios, filters)
+    if options["cache_directory"] is None:
+        return read_records(data, scenarios, filters, chunksize=options["chunksize"])
+
+    cache = RecordCache(options["cache_directory"])
+    records = cache.load(data)
+    if records is None:
+        records = read_records(data, chunksize=options["chunksize"])
+        cache.store(data, records)
+    return filter_records(records, scenarios, filters)
+
+
+def _select_latest(
+    filtered_records: RecordTable,
+    data_type: str,
+    scenarios: Tuple[str],
+    options: dict
+) -> RecordTable:
+    if options["latest_only"]:
+        filtered_records = select_latest_records(
+            filtered_records,
+            scenarios,
+            remove_unpaired=data_type in ("comparisons", "summaries"),
+            pairing=options["pairing"]
+        )
+    return filtered_records
+
+
+def _create_elements(
+    filtered_records: RecordTable,
+    data_type: str,
+    scenarios: Tuple[str],
+    options: dict
+) -> Union[RecordTable, ComparisonTable]:
     if not filtered_records:
         raise ValueError("No records matched the filters provided.")
 
     if data_type == "records":
         elements = filtered_records
 
-    elif data_type == "comparisons":
-        comparisons = create_comparisons(records, scenarios)
+    elif data_type in ("comparisons", "summaries"):
+        comparisons = create_comparisons(
+            filtered_records, scenarios, pairing=options["pairing"]
+        )
         elements = comparisons
     else:
         raise ValueError(f"Unknown data type: {data_type}")
+    return elements
 
-    if groups:
-        grouped_elements = group_elements(groups, elements)
-        all_tables = {}
-        for broad_label in grouped_elements:
-            for narrow_label in grouped_elements[broad_label]:
-                key = f"{broad_label}_{narrow_label}"
-                all_tables[key] = convert_elements_to_format(
-                    elements=grouped_elements[broad_label][narrow_label],
-                    format=data_format,
-                    annotation=data_format
-                )
-        return all_tables
+
+def _render_summaries(
+    comparisons: ComparisonTable,
+    groups: Optional[List[List[Filter]]],
+    data_format: str,
+    options: dict,
+    stats: Optional[PipelineStats] = None
+):
+    with measure(stats, "summarise", len(comparisons)) as stage:
+        summaries = summarise_groups(comparisons, groups, options["rollup"])
+        rows = stage.rows_out = sum(len(summary) for summary in summaries.values())
+    with measure(stats, "format", rows) as stage:
+        result = {
+            key: convert_elements_to_format(
+                elements=summary,
+                format=data_format,
+                annotation=data_format
+            )
+            for key, summary in summaries.items()
+        }
+        stage.rows_out = rows
+    if not groups:
+        return result["summaries"]
+    return result
+
+
+def _group_elements(
+    elements: Union[RecordTable, ComparisonTable],
+    groups: Optional[List[List[Filter]]],
+    options: dict
+) -> Optional[dict]:
+    if not groups:
+        return None
+    return group_elements(
+        groups,
+        elements,
+        include_empty=options["include_empty_groups"],
+        rollup=options["rollup"]
+    )
+
+
+def _format_elements(
+    elements: Union[RecordTable, ComparisonTable],
+    grouped_elements: Optional[dict],
+    data_format: str,
+    options: dict
+):
+    if grouped_elements is not None:
+        return convert_groups_to_format(
+            grouped_elements,
+            format=data_format,
+            annotation=data_format,
+            workers=options["workers"],
+            executor=options["executor"]
+        )
 
     return convert_elements_to_format(
         elements=elements,
@@ -104,7 +610,29 @@ def parse_configuration(
     return data_type, data_format, scenarios, filters, groups
 
 
+def parse_options(
+    configuration: dict
+) -> dict:
+    """
+    Given a configuration, return its optional settings,
+    falling back to the defaults in OPTIONS.
+    """
+    return {
+        option: configuration.get(option, default)
+        for option, default in OPTIONS.items()
+    }
+
+
 __all__ = [
     "create_tables",
-    "parse_configuration"
+    "create_tables_many",
+    "create_coverage_report",
+    "ResultCache",
+    "IncrementalTables",
+    "PipelineStats",
+    "iter_elements",
+    "iter_tables",
+    "write_tables",
+    "parse_configuration",
+    "parse_options",
 ]
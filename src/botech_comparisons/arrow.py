@@ -0,0 +1,119 @@
+"""
+arrow.py
+
+Read and write Parquet and Arrow IPC files.
+
+These formats keep the types of their columns, so there is no
+round trip through text. pyarrow is only imported when they are used.
+"""
+import os
+import pandas as pd
+from .datatypes import Filter
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for the parquet and arrow formats, "
+            "install it with `pip install pyarrow`"
+        ) from e
+    return pyarrow
+
+
+def source_format(filepath: Union[str, os.PathLike]) -> Optional[str]:
+    "Return parquet or arrow if the file is one of them, otherwise None."
+    return FORMATS.get(os.path.splitext(str(filepath))[1].lower())
+
+
+def _filter_expression(
+    names: List[str],
+    scenarios: Optional[Tuple[str]] = None,
+    filters: Optional[Dict[Filter, List[str]]] = None
+):
+    """
+    Combine the scenarios and filters on columns of the file
+    into a single expression, or None if there are none.
+
+    Filters on tags, e.g. REGION, are not columns of the file,
+    and are left to be applied once the tags are attached.
+    """
+    pa = _import_pyarrow()
+    conditions = []
+    if scenarios is not None:
+        conditions.append(pa.compute.field("SCENARIO").isin(list(scenarios)))
+    for filter_type, values in (filters or {}).items():
+        if filter_type.name in names:
+            conditions.append(pa.compute.field(filter_type.name).isin(list(values)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_arrow_data(
+    filepath: Union[str, os.PathLike],
+    columns: List[str],
+    scenarios: Optional[Tuple[str]] = None,
+    filters: Optional[Dict[Filter, List[str]]] = None
+) -> pd.DataFrame:
+    """
+    Read the columns of a Parquet or Arrow IPC file which are present.
+
+    Arrow IPC files are memory-mapped. The scenarios and filters
+    are pushed down into the scan, which lets Parquet skip
+    row groups whose statistics cannot match.
+    """
+    pa = _import_pyarrow()
+    if source_format(filepath) == "parquet":
+        dataset = pa.dataset.dataset(filepath, format="parquet")
+        table = None
+    else:
+        with pa.memory_map(str(filepath), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        dataset = pa.dataset.dataset(table)
+
+    names = [name for name in columns if name in dataset.schema.names]
+    expression = _filter_expression(names, scenarios, filters)
+    try:
+        table = dataset.to_table(columns=names, filter=expression)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        # Filter values of another type than their column, e.g. "1" for 1,
+        # cannot be pushed down, but still match nothing once read
+        table = dataset.to_table(columns=names)
+    return table.to_pandas()
+
+
+def write_dataframe(df: pd.DataFrame, format: str, file: BinaryIO):
+    "Write a DataFrame into an open binary file."
+    pa = _import_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if format == "parquet":
+        pa.parquet.write_table(table, file)
+    elif format == "arrow":
+        with pa.ipc.new_file(file, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown format: {format}")
+
+
+def dataframe_to_bytes(df: pd.DataFrame, format: str) -> bytes:
+    pa = _import_pyarrow()
+    sink = pa.BufferOutputStream()
+    write_dataframe(df, format, sink)
+    return sink.getvalue().to_pybytes()
@@ -3,16 +3,25 @@ blueprint.py
 
 The methods associated with creating a blueprint.
 
-A blueprint is a list of records that should be looked for 
+A blueprint is the index of the records that should be looked for
 in the data source. It refers to the product of every filtered
 value of interest.
 """
-from .datatypes import Filter, Record
+from .datatypes import Filter
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
-import country_metadata
-from country_metadata.country import Country
-from itertools import product
+from .countries import country_index
+from .groups import iter_grouped_elements
+from .tables import Table, create_country_tag_table
+
+BLUEPRINT_LEVELS = ["AUTHOR", "COUNTRY", "INTERVENTION", "SCENARIO"]
+# The tags of country_metadata.get_countries_by_tags that filters refer to
+TAG_TYPES = {
+    Filter.REGION: "region",
+    Filter.INCOME: "income",
+    Filter.APPENDIX_3: "appendix_3",
+}
 
 
 def _determine_filtered_values(
@@ -37,92 +46,83 @@ def _determine_filtered_values(
     return filtered_values
 
 
-def _filter_countries(filters: Dict[Filter, List[str]]) -> List[Country]:
-    "Collect all possible countries that could be included."
-    all_countries = []
-    country_sets = []
-
-    # REGION filter
-    regions = filters.get(Filter.REGION, [])
-    if regions:
-        mapping = country_metadata.get_countries_by_tags("region")
-        countries_by_region = {country.alpha2 for region in regions for country in mapping[region]}
-        country_sets.append(countries_by_region)
-
-    # INCOME filter
-    incomes = filters.get(Filter.INCOME, [])
-    if incomes:
-        mapping = country_metadata.get_countries_by_tags("income")
-        countries_by_income = {country.alpha2 for income in incomes for country in mapping[income]}
-        country_sets.append(countries_by_income)
-
-    # APPENDIX_3 filter
-    appendix_3s = filters.get(Filter.APPENDIX_3, [])
-    if appendix_3s:
-        mapping = country_metadata.get_countries_by_tags("appendix_3")
-        countries_by_appendix_3 = {country.alpha2 for appendix_3 in appendix_3s for country in mapping[appendix_3]}
-        country_sets.append(countries_by_appendix_3)
-
-    # COUNTRY filter
-    if Filter.COUNTRY in filters:
-        countries = set()
-        for country in filters[Filter.COUNTRY]:
-            try:
-                countries.add(country_metadata.get_country(country).alpha2)
-            except KeyError:
-                pass
-        country_sets.append(countries)
-
-    # Find intersection if there are any sets to intersect
-    if country_sets:
-        all_countries = set.intersection(*country_sets)
-    else:
-        # If no filters, return all countries
-        all_countries = {country.alpha2 for country in country_metadata.countries}
-
-    return list(all_countries)
-
-
-def _create_all_record_combinations(
-    scenarios: Tuple[str],
-    filtered_values: Dict[Filter, List[str]],
-) -> List[Record]:
+def _filter_countries(filters: Dict[Filter, List[str]]) -> List[str]:
     """
-    Make all possible combinations of records.
+    Collect all possible countries that could be included.
+
+    Each filter selects positions of the country index,
+    and the countries selected by every filter are returned.
     """
-    records = []
-    authors = filtered_values.get(Filter.AUTHOR, [None])
-    countries = filtered_values.get(Filter.COUNTRY, [None])
-    interventions = filtered_values.get(Filter.INTERVENTION, [None])
-    scenarios = list(scenarios)
-    timestamps = [None]
-    effects = [None]
-    costs = [None]
-
-    for combination in product(
-        authors,
-        countries,
-        interventions,
-        scenarios,
-        timestamps,
-        effects,
-        costs
-    ):
-        record = Record(*combination)
-        records.append(record)
-
-    return records
+    filters = filters or {}
+    mask = np.ones(len(country_index), dtype=bool)
+    for filter_type, tag_type in TAG_TYPES.items():
+        values = filters.get(filter_type, [])
+        if values:
+            mask &= country_index.tag_mask(tag_type, values)
+    if Filter.COUNTRY in filters:
+        mask &= country_index.country_mask(filters[Filter.COUNTRY])
+    return country_index.countries[mask].tolist()
 
 
 def create_blueprint(
     df: pd.DataFrame,
     scenarios: Tuple[str],
     filters: Optional[Dict[Filter, List[str]]] = None
-) -> List[Record]:
+) -> pd.MultiIndex:
     """
-    Create a list of records with all data requirements.
+    Create the index of every record that should be in the data source.
+
+    The product is held as the levels and codes of a MultiIndex,
+    so no Record, or even tuple, is built for any of its cells.
     """
-    records = []
     filtered_values = _determine_filtered_values(df, filters)
-    records = _create_all_record_combinations(scenarios, filtered_values)
-    return records
+    return pd.MultiIndex.from_product(
+        [
+            filtered_values[Filter.AUTHOR],
+            sorted(filtered_values[Filter.COUNTRY]),
+            filtered_values[Filter.INTERVENTION],
+            list(scenarios),
+        ],
+        names=BLUEPRINT_LEVELS
+    )
+
+
+def find_missing(
+    df: pd.DataFrame,
+    scenarios: Tuple[str],
+    filters: Optional[Dict[Filter, List[str]]] = None
+) -> pd.DataFrame:
+    """
+    Return the cells of the blueprint which are absent from the data.
+
+    A cell is "missing" if no scenario of its model,
+    i.e. AUTHOR, COUNTRY and INTERVENTION, was run,
+    and "unpaired" if only some of them were.
+    The tags of each country are attached, so the cells can be grouped.
+    """
+    blueprint = create_blueprint(df, scenarios, filters)
+    found = pd.MultiIndex.from_frame(df[BLUEPRINT_LEVELS])
+
+    # Anti-join: keep the cells of the blueprint with no match in the data
+    absent = blueprint[~blueprint.isin(found)]
+    run = absent.droplevel("SCENARIO").isin(found.droplevel("SCENARIO"))
+
+    missing = absent.to_frame(index=False)
+    missing["STATUS"] = np.where(run, "unpaired", "missing")
+    lookup = create_country_tag_table(missing["COUNTRY"].unique())
+    return missing.merge(lookup, on="COUNTRY", how="left", sort=False)
+
+
+def group_missing(
+    missing: pd.DataFrame,
+    groups: List[List[Filter]]
+) -> Dict[str, pd.DataFrame]:
+    """
+    Split the absent cells by each group,
+    keyed by "{broad_label}_{narrow_label}" like the tables they are absent from.
+    Only the groups with absent cells are returned.
+    """
+    return {
+        f"{group_key}_{combo_key}": cell.to_dataframe()
+        for group_key, combo_key, cell in iter_grouped_elements(groups, Table(missing))
+    }
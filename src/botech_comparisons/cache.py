@@ -0,0 +1,240 @@
+"""
+cache.py
+
+Cache the records of a data source on disk,
+so that an unchanged source is not parsed and enriched again,
+and cache results in memory, so that a repeated request is not recomputed.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+import country_metadata
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Union
+from .tables import RECORD_COLUMNS, RecordTable, Table
+
+# Bump when the cached table changes shape, to invalidate old entries
+CACHE_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_file(filepath: Union[str, os.PathLike]) -> str:
+    "Hash the contents of a file, one block at a time."
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RecordCache:
+    """
+    Enriched RecordTables stored in a directory, keyed by source path.
+
+    An entry is valid while its source has the same size and
+    modification time. If either changed, the contents are hashed,
+    and the entry is still used if the hash matches, e.g. after a touch.
+    """
+    def __init__(self, directory: Union[str, os.PathLike]):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, filepath: Union[str, os.PathLike]):
+        source = os.path.abspath(filepath)
+        key = hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+        base = os.path.join(self.directory, key)
+        return source, f"{base}.json", f"{base}.pkl"
+
+    def _expected_metadata(self, source: str) -> dict:
+        return {
+            "version": CACHE_VERSION,
+            "source": source,
+            "columns": RECORD_COLUMNS,
+            "country_metadata": getattr(country_metadata, "__version__", None),
+            # A pickle may not load, or load differently, in another pandas
+            "pandas": pd.__version__,
+        }
+
+    def load(self, filepath: Union[str, os.PathLike]) -> Optional[RecordTable]:
+        "Return the cached table of a source, or None if it is missing or stale."
+        source, metadata_path, table_path = self._paths(filepath)
+        try:
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        stat = os.stat(source)
+        expected = self._expected_metadata(source)
+        if any(metadata.get(key) != value for key, value in expected.items()):
+            self.misses += 1
+            return None
+        if (metadata["size"], metadata["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+            if metadata["size"] != stat.st_size or metadata["hash"] != hash_file(source):
+                self.misses += 1
+                return None
+            metadata["mtime_ns"] = stat.st_mtime_ns
+            self._write_metadata(metadata_path, metadata)
+
+        try:
+            df = pd.read_pickle(table_path)
+        except Exception:
+            # Missing, truncated or otherwise unreadable: read the source again
+            self.misses += 1
+            return None
+        self.hits += 1
+        return RecordTable(df)
+
+    def store(self, filepath: Union[str, os.PathLike], records: RecordTable):
+        "Cache the table of a source, replacing any previous entry."
+        source, metadata_path, table_path = self._paths(filepath)
+        os.makedirs(self.directory, exist_ok=True)
+        stat = os.stat(source)
+        metadata = {
+            **self._expected_metadata(source),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": hash_file(source),
+        }
+        # Write to temporary files first, so a reader never sees half an entry
+        records.df.to_pickle(f"{table_path}.tmp", protocol=5)
+        os.replace(f"{table_path}.tmp", table_path)
+        self._write_metadata(metadata_path, metadata)
+
+    def _write_metadata(self, metadata_path: str, metadata: dict):
+        with open(f"{metadata_path}.tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(f"{metadata_path}.tmp", metadata_path)
+
+
+def data_fingerprint(data: Union[pd.DataFrame, RecordTable, str, os.PathLike]) -> str:
+    """
+    Identify a version of the data.
+
+    DataFrames and tables are hashed by their contents,
+    files by their path, size and modification time.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, Table):
+        data = data.df
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr((list(data.columns), data.shape)).encode("utf-8"))
+        hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+        digest.update(hashes.tobytes())
+    else:
+        source = os.path.abspath(data)
+        stat = os.stat(source)
+        digest.update(repr((source, stat.st_size, stat.st_mtime_ns)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _sizeof(value) -> int:
+    "Estimate the bytes held by a cached value."
+    if isinstance(value, Table):
+        return _sizeof(value.df)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _sizeof(key) + _sizeof(item) for key, item in value.items()
+        )
+    if isinstance(value, list):
+        # Elements of a list are all of one kind, so measure the first
+        return sys.getsizeof(value) + len(value) * (_sizeof(value[0]) if value else 0)
+    if hasattr(value, "__slots__"):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(getattr(value, slot)) for slot in value.__slots__
+        )
+    return sys.getsizeof(value)
+
+
+# Returned by ResultCache.get for a missing key, when asked to
+MISSING = object()
+
+
+def _copy(value):
+    "Shallow copy a result, so callers cannot change what is cached."
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+class ResultCache:
+    """
+    A least recently used cache of results,
+    bounded by the number of entries and by their estimated bytes.
+
+    Values are copied on the way out, so they can be changed
+    by the caller without changing the cache.
+    The cache can be shared between threads.
+    """
+    def __init__(self, max_entries: int = 128, max_bytes: int = 512 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            value = self._entries[key][0]
+        return _copy(value)
+
+    def put(self, key: Hashable, value):
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_create(self, key: Hashable, create: Callable[[], object]):
+        "Return the cached value of a key, creating and caching it if missing."
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = create()
+            self.put(key, value)
+        return value
+
+    def statistics(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
@@ -3,63 +3,123 @@ comparisons.py
 
 Compare Records to produce Comparisons.
 """
-from .datatypes import Comparison, Record
-from typing import Tuple, List
+from .datatypes import Record
+from .tables import KEY_COLUMNS, RECORD_COLUMNS, ComparisonTable, RecordTable
+from typing import Tuple, List, Optional, Union
+from itertools import combinations
+import numpy as np
 import pandas as pd
 from dataclasses import asdict
 
 
+PAIRINGS = ["reference", "all_pairs"]
+
+
+def scenario_pairs(
+    scenarios: Tuple[str],
+    pairing: Optional[str] = None
+) -> List[Tuple[str, str]]:
+    """
+    The pairs of scenarios to compare.
+
+    Without a pairing, there must be exactly two scenarios.
+    With "reference", the first scenario is compared with each of the others,
+    and with "all_pairs", every scenario is compared with each one after it.
+    """
+    if len(set(scenarios)) != len(scenarios):
+        raise ValueError(f"Scenarios must be unique: {scenarios}")
+    if pairing is None:
+        if len(scenarios) != 2:
+            raise ValueError(
+                f"Exactly two scenarios are compared without a pairing, not {len(scenarios)}"
+            )
+        return [tuple(scenarios)]
+    if pairing not in PAIRINGS:
+        raise ValueError(f"Unknown pairing: {pairing}")
+    if len(scenarios) < 2:
+        raise ValueError("At least two scenarios are needed to compare them")
+    if pairing == "reference":
+        return [(scenarios[0], scenario) for scenario in scenarios[1:]]
+    return list(combinations(scenarios, 2))
+
+
 def create_comparisons(
-    filtered_records: List[Record],
-    scenarios: Tuple[str]
-) -> List[Comparison]:
+    filtered_records: Union[RecordTable, List[Record]],
+    scenarios: Tuple[str],
+    pairing: Optional[str] = None
+) -> ComparisonTable:
+    """
+    Match all records, and convert them to a table of Comparisons.
+
+    Records are paired on AUTHOR, COUNTRY and INTERVENTION.
+    For each pair of scenarios, every record of the first is kept,
+    in the order of the data, and is paired with the first record
+    of the second scenario sharing its key.
+    Each comparison keeps the index of its first record,
+    and the comparisons of each pair follow those of the pair before.
+
+    The first record of every key in every scenario is found once,
+    so any number of pairs costs a lookup and a few column operations each.
+    """
+    pairs = scenario_pairs(scenarios, pairing)
+
+    if isinstance(filtered_records, RecordTable):
+        df = filtered_records.df
+    else:
+        df = pd.DataFrame(
+            [asdict(record) for record in filtered_records],
+            columns=RECORD_COLUMNS
+        )
+
+    key_codes = df.groupby(KEY_COLUMNS, sort=False, dropna=False).ngroup().to_numpy()
+    scenario_codes = pd.Index(scenarios).get_indexer(df["SCENARIO"])
+
+    # Pivot: the position of the first record of each key in each scenario
+    first = np.full((key_codes.max(initial=-1) + 1, len(scenarios)), -1)
+    rows = np.flatnonzero(scenario_codes >= 0)
+    cells = key_codes[rows] * len(scenarios) + scenario_codes[rows]
+    _, first_of_cell = np.unique(cells, return_index=True)
+    first.flat[cells[first_of_cell]] = rows[first_of_cell]
+
+    frames = []
+    for scenario_one, scenario_two in pairs:
+        rows_one = np.flatnonzero(scenario_codes == scenarios.index(scenario_one))
+        partners = first[key_codes[rows_one], scenarios.index(scenario_two)]
+        matched = partners >= 0
+        records_one = df.iloc[rows_one[matched]]
+        records_two = df.iloc[partners[matched]].set_axis(records_one.index)
+        frames.append(pd.concat(
+            [
+                records_one.add_prefix("S1_"),
+                records_two.add_prefix("S2_"),
+            ],
+            axis=1
+        ))
+    df = frames[0] if len(frames) == 1 else pd.concat(frames)
+
+    net_effects = df["S2_EFFECTS"] - df["S1_EFFECTS"]
+    net_costs = df["S2_COSTS"] - df["S1_COSTS"]
+    df["NET_EFFECTS"] = net_effects
+    df["NET_COSTS"] = net_costs
+    df["COST_EFFECTIVENESS"] = (net_effects / net_costs).where(
+        net_costs != 0, float("inf")
+    )
+    return ComparisonTable(df)
+
+
+def order_by_pairs(
+    comparisons: ComparisonTable,
+    scenarios: Tuple[str],
+    pairing: Optional[str],
+    order: np.ndarray
+) -> ComparisonTable:
     """
-    Match all records, and convert them to Comparison objects.
+    Put comparisons in the order create_comparisons gives them:
+    pair by pair, and by the given order within each pair,
+    e.g. the position of their first record in the data.
     """
-    comparisons = []
-    scenario_one_label, scenario_two_label = scenarios
-
-    df = pd.DataFrame([asdict(record) for record in filtered_records])
-
-    for _, row in df.iterrows():
-        if row['SCENARIO'] == scenario_one_label:
-            match = df[
-                (df['AUTHOR'] == row['AUTHOR'])
-                & (df['COUNTRY'] == row['COUNTRY'])
-                & (df['INTERVENTION'] == row['INTERVENTION'])
-                & (df['SCENARIO'] == scenario_two_label)
-            ]
-            if not match.empty:
-                match_row = match.iloc[0]
-
-                # Create Record instances for each scenario
-                scenario_one_record = Record(
-                    UID=row.get('UID'),
-                    AUTHOR=row['AUTHOR'],
-                    COUNTRY=row['COUNTRY'],
-                    INTERVENTION=row['INTERVENTION'],
-                    SCENARIO=row['SCENARIO'],
-                    TIMESTAMP=row['TIMESTAMP'],
-                    EFFECTS=row['EFFECTS'],
-                    COSTS=row['COSTS']
-                )
-
-                scenario_two_record = Record(
-                    UID=match_row.get('UID'),
-                    AUTHOR=match_row['AUTHOR'],
-                    COUNTRY=match_row['COUNTRY'],
-                    INTERVENTION=match_row['INTERVENTION'],
-                    SCENARIO=match_row['SCENARIO'],
-                    TIMESTAMP=match_row['TIMESTAMP'],
-                    EFFECTS=match_row['EFFECTS'],
-                    COSTS=match_row['COSTS']
-                )
-
-                # Create a Comparison object
-                comparison = Comparison(
-                    SCENARIO_ONE=scenario_one_record,
-                    SCENARIO_TWO=scenario_two_record
-                )
-                comparisons.append(comparison)
-
-    return comparisons
+    pairs = pd.MultiIndex.from_tuples(scenario_pairs(scenarios, pairing))
+    rank = pairs.get_indexer(
+        pd.MultiIndex.from_frame(comparisons.df[["S1_SCENARIO", "S2_SCENARIO"]])
+    )
+    return comparisons.take(np.lexsort((order, rank)))
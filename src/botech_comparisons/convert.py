@@ -1,31 +1,50 @@
-from typing import List, Union
-from .datatypes import Comparison, Record
-from dataclasses import asdict
-import pandas as pd
+from typing import Dict, Iterator, List, Tuple, Union
+from .datatypes import Comparison, Record, Summary
+from .arrow import dataframe_to_bytes
+from .tables import ComparisonTable, RecordTable, SummaryTable, Table
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTORS = {
+    "process": ProcessPoolExecutor,
+    "thread": ThreadPoolExecutor,
+}
+# Below this many tables per worker, a pool costs more than it saves
+MIN_TABLES_PER_WORKER = 8
+
+
+def _to_table(
+    elements: Union[List[Record], List[Comparison], List[Summary], Table]
+) -> Table:
+    "Arrange elements as columns, without copying them into dicts."
+    if isinstance(elements, Table):
+        return elements
+    if elements and isinstance(elements[0], Comparison):
+        return ComparisonTable.from_comparisons(elements)
+    if elements and isinstance(elements[0], Summary):
+        return SummaryTable.from_summaries(elements)
+    return RecordTable.from_records(elements)
 
 
 def convert_elements_to_format(
-    elements: Union[List[Record], List[Comparison]],
+    elements: Union[
+        List[Record],
+        List[Comparison],
+        List[Summary],
+        Table
+    ],
     format: str,
     annotation: str
 ):
-    if elements and isinstance(elements[0], Comparison):
-        data = []
-        for comparison in elements:
-            # Create unique keys for each field in SCENARIO_ONE and SCENARIO_TWO
-            s1_data = {f"S1_{k}": v for k, v in asdict(comparison.SCENARIO_ONE).items()}
-            s2_data = {f"S2_{k}": v for k, v in asdict(comparison.SCENARIO_TWO).items()}
-
-            # Merge data and add comparison specific fields
-            row = {**s1_data, **s2_data,
-                   'NET_EFFECTS': comparison.NET_EFFECTS,
-                   'NET_COSTS': comparison.NET_COSTS,
-                   'COST_EFFECTIVENESS': comparison.COST_EFFECTIVENESS}
-            data.append(row)
-        df = pd.DataFrame(data)
-    else:
-        df = pd.DataFrame([asdict(element) for element in elements])
+    """
+    Dataclasses are only built for the "self" format,
+    every other format is converted from the columns of a table.
+    """
+    if format == "self":
+        if isinstance(elements, Table):
+            return list(elements)
+        return elements
 
+    df = _to_table(elements).to_dataframe()
     df.name = annotation
 
     # Convert DataFrame to the specified format
@@ -35,9 +54,57 @@ def convert_elements_to_format(
         return df.to_csv(index=False)
     elif format == "html":
         return df.to_html(index=False)
-    elif format == "self":
-        return elements
+    elif format in ["parquet", "arrow"]:
+        return dataframe_to_bytes(df, format)
     else:
         raise ValueError(f"Unknown format: {format}")
 
 
+def iter_groups(
+    grouped_elements: Dict[str, Dict[str, Union[List, Table]]]
+) -> Iterator[Tuple[str, Union[List, Table]]]:
+    "Yield each group of elements, keyed by {broad_label}_{narrow_label}."
+    for broad_label in grouped_elements:
+        for narrow_label in grouped_elements[broad_label]:
+            yield f"{broad_label}_{narrow_label}", grouped_elements[broad_label][narrow_label]
+
+
+def convert_groups_to_format(
+    grouped_elements: Dict[str, Dict[str, Union[List, RecordTable, ComparisonTable]]],
+    format: str,
+    annotation: str,
+    workers: int = 1,
+    executor: str = "process"
+) -> dict:
+    """
+    Convert every group of elements, keyed by "{broad_label}_{narrow_label}".
+
+    With more than one worker, and enough tables to keep them busy,
+    the tables are converted on a pool of processes or threads.
+    The keys keep the order of grouped_elements either way.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor}")
+
+    keys = []
+    groups = []
+    for key, elements in iter_groups(grouped_elements):
+        keys.append(key)
+        groups.append(elements)
+
+    workers = min(workers, len(groups) // MIN_TABLES_PER_WORKER)
+    if workers <= 1:
+        tables = [
+            convert_elements_to_format(elements, format, annotation)
+            for elements in groups
+        ]
+    else:
+        with EXECUTORS[executor](max_workers=workers) as pool:
+            tables = list(pool.map(
+                convert_elements_to_format,
+                groups,
+                [format] * len(groups),
+                [annotation] * len(groups),
+                chunksize=max(1, len(groups) // (workers * 4))
+            ))
+    return dict(zip(keys, tables))
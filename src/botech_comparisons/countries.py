@@ -0,0 +1,198 @@
+"""
+countries.py
+
+Resolve the tags of countries, e.g. region and income.
+
+There are only a few hundred countries, but millions of records,
+so every tag is resolved once per process and then looked up.
+"""
+import sys
+import country_metadata
+import numpy as np
+import pandas as pd
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+TAG_SOURCES = {
+    "REGION": "wb_region",
+    "INCOME": "wb_income",
+    "APPENDIX_3": "appendix_3",
+}
+TAG_COLUMNS = list(TAG_SOURCES)
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+class CountryTagResolver:
+    """
+    A memoized view of country_metadata.
+
+    Tags are precomputed for every known country on first use,
+    and unknown countries are resolved once and remembered.
+    """
+    def __init__(self):
+        self._tags: Dict[str, Tuple[Optional[str], ...]] = {}
+        self._countries_by_tag: Dict[str, Dict[str, FrozenSet[str]]] = {}
+        self._alpha2: Dict[str, Optional[str]] = {}
+        self._warm = False
+        self.hits = 0
+        self.misses = 0
+
+    def warm_up(self):
+        "Resolve the tags of every known country."
+        for country in country_metadata.countries:
+            self._resolve(country.alpha2)
+        self._warm = True
+
+    def _resolve(self, country: str) -> Tuple[Optional[str], ...]:
+        tags = []
+        for tag in TAG_SOURCES.values():
+            try:
+                tags.append(_intern(country_metadata.get_tag(country, tag)))
+            except KeyError:
+                tags.append(None)
+        tags = tuple(tags)
+        self._tags[_intern(country)] = tags
+        return tags
+
+    def get_tags(self, country: str) -> Tuple[Optional[str], ...]:
+        "Return the REGION, INCOME and APPENDIX_3 of a country."
+        if not self._warm:
+            self.warm_up()
+        try:
+            tags = self._tags[country]
+        except KeyError:
+            self.misses += 1
+            return self._resolve(country)
+        self.hits += 1
+        return tags
+
+    def get_tag(self, country: str, column: str) -> Optional[str]:
+        "Return a single tag of a country, e.g. its REGION."
+        return self.get_tags(country)[TAG_COLUMNS.index(column)]
+
+    def countries_by_tag(self, tag_type: str) -> Dict[str, FrozenSet[str]]:
+        "Return the alpha2 codes of the countries under each value of a tag."
+        if tag_type not in self._countries_by_tag:
+            mapping = country_metadata.get_countries_by_tags(tag_type)
+            self._countries_by_tag[tag_type] = {
+                value: frozenset(_intern(country.alpha2) for country in countries)
+                for value, countries in mapping.items()
+            }
+        return self._countries_by_tag[tag_type]
+
+    def get_alpha2(self, country: str) -> Optional[str]:
+        "Return the alpha2 code of a country, or None if it is unknown."
+        if country not in self._alpha2:
+            try:
+                alpha2 = _intern(country_metadata.get_country(country).alpha2)
+            except KeyError:
+                alpha2 = None
+            self._alpha2[country] = alpha2
+        return self._alpha2[country]
+
+    def all_countries(self) -> List[str]:
+        return [country.alpha2 for country in country_metadata.countries]
+
+    def statistics(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "countries": len(self._tags),
+            "warm": self._warm,
+        }
+
+    def clear(self):
+        self.__init__()
+
+
+resolver = CountryTagResolver()
+
+
+class CountryIndex:
+    """
+    Every known country at a fixed position, and for each tag,
+    an array coding the value of that tag at each position.
+
+    Combinations of tag and country filters are resolved
+    by combining boolean arrays, rather than intersecting sets of codes.
+    Tags of TAG_SOURCES, e.g. "wb_region", are coded as a Record resolves them,
+    and any other tag, e.g. "region", as country_metadata.get_countries_by_tags does.
+    """
+    def __init__(self, resolver: CountryTagResolver):
+        self.resolver = resolver
+        self._countries: Optional[np.ndarray] = None
+        self._positions: Dict[str, int] = {}
+        self._codes: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+
+    def _build(self):
+        countries = sorted(self.resolver.all_countries())
+        self._positions = {country: i for i, country in enumerate(countries)}
+        self._countries = np.array(countries, dtype=object)
+
+    @property
+    def countries(self) -> np.ndarray:
+        "The alpha2 code of the country at each position."
+        if self._countries is None:
+            self._build()
+        return self._countries
+
+    def __len__(self) -> int:
+        return len(self.countries)
+
+    def position(self, country: str) -> int:
+        "Return the position of a country, or -1 if it is unknown."
+        if self._countries is None:
+            self._build()
+        if country not in self._positions:
+            self._positions[country] = self._positions.get(
+                self.resolver.get_alpha2(country), -1
+            )
+        return self._positions[country]
+
+    def _coded(self, tag_type: str) -> Tuple[np.ndarray, pd.Index]:
+        "The code of the tag of each country, and the values coded."
+        if tag_type not in self._codes:
+            if tag_type in TAG_SOURCES.values():
+                column = list(TAG_SOURCES.values()).index(tag_type)
+                values = [self.resolver.get_tags(country)[column] for country in self.countries]
+            else:
+                values = [None] * len(self)
+                for value, countries in self.resolver.countries_by_tag(tag_type).items():
+                    for country in countries:
+                        values[self.position(country)] = value
+            codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+            self._codes[tag_type] = (codes, uniques)
+        return self._codes[tag_type]
+
+    def tag_mask(self, tag_type: str, values: Iterable[str]) -> np.ndarray:
+        "Which countries have one of the values of a tag."
+        codes, uniques = self._coded(tag_type)
+        return np.isin(codes, np.flatnonzero(uniques.isin(list(values))))
+
+    def country_mask(self, countries: Iterable[str]) -> np.ndarray:
+        "Which countries are among the countries, given by any code."
+        mask = np.zeros(len(self), dtype=bool)
+        positions = [self.position(country) for country in countries]
+        mask[[position for position in positions if position >= 0]] = True
+        return mask
+
+    def row_mask(self, countries: pd.Series, tag_type: str, values: Iterable[str]) -> np.ndarray:
+        "Which rows of a column of countries have one of the values of a tag."
+        row_codes, uniques = pd.factorize(countries)
+        positions = np.array([self.position(country) for country in uniques], dtype=np.intp)
+        selected = self.tag_mask(tag_type, values)
+        # One more entry, False, for the rows without a country (code -1)
+        matched = np.append(
+            np.where(positions >= 0, selected[positions], False), False
+        )
+        return matched[row_codes]
+
+    def clear(self):
+        self.__init__(self.resolver)
+
+
+country_index = CountryIndex(resolver)
@@ -3,14 +3,14 @@ datatypes.py
 
 Defining our datastructures
 """
-import country_metadata
+from .countries import _intern, resolver
 from typing import Optional
 from enum import Enum
 from dataclasses import dataclass, field
 import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Record:
     AUTHOR: str
     COUNTRY: str
@@ -25,21 +25,15 @@ class Record:
     UID: Optional[str] = None
 
     def __post_init__(self):
-        try:
-            self.REGION = country_metadata.get_tag(self.COUNTRY, "wb_region")
-        except KeyError:
-            self.REGION = None
-        try:
-            self.INCOME = country_metadata.get_tag(self.COUNTRY, "wb_income")
-        except KeyError:
-            self.INCOME = None
-        try:
-            self.APPENDIX_3 = country_metadata.get_tag(self.COUNTRY, "appendix_3")
-        except KeyError:
-            self.APPENDIX_3 = None
+        # Categorical fields repeat across millions of records, so share their strings
+        self.AUTHOR = _intern(self.AUTHOR)
+        self.COUNTRY = _intern(self.COUNTRY)
+        self.INTERVENTION = _intern(self.INTERVENTION)
+        self.SCENARIO = _intern(self.SCENARIO)
+        self.REGION, self.INCOME, self.APPENDIX_3 = resolver.get_tags(self.COUNTRY)
 
 
-@dataclass
+@dataclass(slots=True)
 class Comparison:
     SCENARIO_ONE: Record
     SCENARIO_TWO: Record
@@ -57,6 +51,31 @@ class Comparison:
             self.COST_EFFECTIVENESS = float('inf')
 
 
+@dataclass(slots=True)
+class Summary:
+    """
+    The comparisons of one cell of a group, e.g. REGION North America,
+    for one pair of scenarios, totalled, with their pooled cost-effectiveness,
+    NET_EFFECTS / NET_COSTS, and the distribution of the cost-effectiveness
+    of each comparison.
+    """
+    GROUP: str
+    CELL: str
+    S1_SCENARIO: str
+    S2_SCENARIO: str
+    COUNT: int
+    S1_EFFECTS: float
+    S1_COSTS: float
+    S2_EFFECTS: float
+    S2_COSTS: float
+    NET_EFFECTS: float
+    NET_COSTS: float
+    COST_EFFECTIVENESS: float
+    MIN_COST_EFFECTIVENESS: float
+    MEDIAN_COST_EFFECTIVENESS: float
+    MAX_COST_EFFECTIVENESS: float
+
+
 class Filter(Enum):
     AUTHOR = 1
     COUNTRY = 2
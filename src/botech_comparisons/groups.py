@@ -5,63 +5,221 @@ Methods to group elements together,
 based on common properties e.g. region, income.
 """
 from .datatypes import Comparison, Filter, Record
-from typing import Dict, List, Union
+from .tables import Table
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
 from itertools import product
+import numpy as np
+import pandas as pd
 
+filter_to_attr = {
+    Filter.AUTHOR: 'AUTHOR',
+    Filter.COUNTRY: 'COUNTRY',
+    Filter.INTERVENTION: 'INTERVENTION',
+    Filter.REGION: 'REGION',
+    Filter.INCOME: 'INCOME',
+    Filter.APPENDIX_3: 'APPENDIX_3'
+}
+# The value of an attribute which has been rolled up into a subtotal
+TOTAL = "Total"
 
-def group_elements(
-    groups: List[List[Filter]],
-    elements: List[Union[Comparison, Record]]
-) -> Dict[str, Dict[str, List[Union[Comparison, Record]]]]:
+
+def _index_elements(
+    elements: List[Union[Comparison, Record]],
+    attributes: List[str]
+) -> Dict[tuple, List[int]]:
     """
-    Group elements together based on common properties.
+    Bucket the positions of elements by their values of the attributes.
+
+    Comparisons are grouped by the Record of the first scenario.
     """
+    index = {}
+    for position, element in enumerate(elements):
+        record = element.SCENARIO_ONE if isinstance(element, Comparison) else element
+        key = tuple(getattr(record, attribute) for attribute in attributes)
+        index.setdefault(key, []).append(position)
+    return index
+
+
+def _group_codes(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    "Number the combinations of values of the columns, in order of appearance."
+    if not columns:
+        return np.zeros(len(df), dtype=np.intp)
+    return df.groupby(columns, sort=False, dropna=False).ngroup().to_numpy()
 
-    def get_unique_values(elements, filter_name):
-        return set(getattr(elem, filter_name) for elem in elements)
 
-    filter_to_attr = {
-        Filter.AUTHOR: 'AUTHOR',
-        Filter.COUNTRY: 'COUNTRY',
-        Filter.INTERVENTION: 'INTERVENTION',
-        Filter.REGION: 'REGION',
-        Filter.INCOME: 'INCOME',
-        Filter.APPENDIX_3: 'APPENDIX_3'
+def _buckets(codes: np.ndarray) -> List[np.ndarray]:
+    "The positions holding each code, for codes numbered from 0."
+    if not len(codes):
+        return []
+    order = np.argsort(codes, kind="stable")
+    boundaries = np.cumsum(np.bincount(codes))[:-1]
+    return np.split(order, boundaries)
+
+
+class GroupingSets:
+    """
+    The rows of a table, grouped by several arrangements of attributes.
+
+    The rows are hashed once, by the finest grouping,
+    i.e. every attribute of every arrangement,
+    and each arrangement is then grouped from the cells of the finest grouping,
+    of which there are far fewer than rows.
+    """
+    def __init__(self, table: Table, arrangements: Sequence[Sequence[str]]):
+        self.table = table
+        attributes = list(dict.fromkeys(
+            attribute
+            for arrangement in arrangements
+            for attribute in arrangement
+        ))
+        columns = [table.key_column(attribute) for attribute in attributes]
+        # The finest cell of each row, and the values of each finest cell
+        self.codes = _group_codes(table.df, columns)
+        _, first_rows = np.unique(self.codes, return_index=True)
+        self.cells = table.df[columns].iloc[first_rows].reset_index(drop=True)
+
+    def cell_codes(self, attributes: Sequence[str]) -> Tuple[np.ndarray, List[tuple]]:
+        """
+        The code of each finest cell in the grouping by the attributes,
+        and the values of the attributes for each code.
+        """
+        columns = [self.table.key_column(attribute) for attribute in attributes]
+        cell_codes = _group_codes(self.cells, columns)
+        _, first_cells = np.unique(cell_codes, return_index=True)
+        if not columns:
+            return cell_codes, [()] * len(first_cells)
+        keys = list(self.cells[columns].iloc[first_cells].itertuples(index=False, name=None))
+        return cell_codes, keys
+
+    def index(self, attributes: Sequence[str]) -> Dict[tuple, np.ndarray]:
+        "Bucket the positions of rows by their values of the attributes."
+        cell_codes, keys = self.cell_codes(attributes)
+        return dict(zip(keys, _buckets(cell_codes[self.codes])))
+
+
+def _rollup(
+    index: Dict[tuple, Sequence[int]],
+    width: int
+) -> Dict[tuple, np.ndarray]:
+    """
+    Add subtotals to an index, as in SQL's ROLLUP,
+    by merging the buckets which share their first values.
+
+    For attributes (a, b), the cells of each a are added as (a, TOTAL),
+    and the cell of every element as (TOTAL, TOTAL).
+    """
+    rolled_up = dict(index)
+    for width_kept in range(width - 1, -1, -1):
+        merged = {}
+        for key, positions in index.items():
+            subtotal = key[:width_kept] + (TOTAL,) * (width - width_kept)
+            merged.setdefault(subtotal, []).append(np.asarray(positions, dtype=np.intp))
+        for subtotal, buckets in merged.items():
+            rolled_up[subtotal] = np.sort(np.concatenate(buckets))
+    return rolled_up
+
+
+def _add_empty_cells(index: Dict[tuple, list], width: int) -> Dict[tuple, list]:
+    """
+    Add every combination of the values found, even those with no elements.
+    """
+    unique_values = [
+        list(dict.fromkeys(key[i] for key in index))
+        for i in range(width)
+    ]
+    return {
+        combination: index.get(combination, [])
+        for combination in product(*unique_values)
     }
 
-    grouped_elements = {}
-    for group in groups:
-        group_key = ', '.join(filter_to_attr[f] for f in group)
-        grouped_elements[group_key] = {}
 
-        if all(isinstance(elem, Record) for elem in elements):
-            unique_values = [
-                get_unique_values(elements, filter_to_attr[f])
-                for f in group
-            ]
-        elif all(isinstance(elem, Comparison) for elem in elements):
-            records = [
-                comp.SCENARIO_ONE
-                for comp in elements
-            ] + [
-                comp.SCENARIO_TWO
-                for comp in elements
-            ]
-            unique_values = [
-                get_unique_values(records, filter_to_attr[f])
-                for f in group
-            ]
-        else:
+def iter_grouped_positions(
+    groups: List[List[Filter]],
+    elements: Union[Table, List[Union[Comparison, Record]]],
+    include_empty: bool = False,
+    rollup: bool = False
+) -> Iterator[Tuple[str, str, Sequence[int]]]:
+    """
+    Yield (group_key, combo_key, positions) for each cell of each group,
+    where positions are those of the elements in the cell.
+
+    The elements of a table are hashed once for every group,
+    by a GroupingSets, and only the index of a group is held in memory.
+    With rollup, each group is followed by its subtotals.
+    """
+    if not isinstance(elements, Table):
+        if not (
+            all(isinstance(elem, Record) for elem in elements)
+            or all(isinstance(elem, Comparison) for elem in elements)
+        ):
             raise ValueError("Elements must be all Comparisons or all Records")
 
-        combinations = product(*unique_values)
-        for combo in combinations:
-            combo_key = ', '.join(str(item) for item in combo)
-            filtered_elements = [
-                elem
-                for elem in elements
-                if all(getattr(elem if isinstance(elem, Record) else getattr(elem, 'SCENARIO_ONE'), filter_to_attr[group[i]]) == combo[i] for i in range(len(group)))
+    arrangements = [[filter_to_attr[f] for f in group] for group in groups]
+    if isinstance(elements, Table) and len(elements):
+        grouping_sets = GroupingSets(elements, arrangements)
+    for attributes in arrangements:
+        group_key = ', '.join(attributes)
+
+        if isinstance(elements, Table):
+            index = grouping_sets.index(attributes) if len(elements) else {}
+        else:
+            index = _index_elements(elements, attributes)
+        if include_empty:
+            index = _add_empty_cells(index, len(attributes))
+        if rollup:
+            index = _rollup(index, len(attributes))
+
+        for combo, positions in index.items():
+            yield group_key, ', '.join(str(item) for item in combo), positions
+
+
+def iter_grouped_elements(
+    groups: List[List[Filter]],
+    elements: Union[Table, Iterable[Union[Comparison, Record]]],
+    include_empty: bool = False,
+    rollup: bool = False
+) -> Iterator[Tuple[str, str, Union[Table, List[Union[Comparison, Record]]]]]:
+    """
+    Yield (group_key, combo_key, elements) for each cell of each group,
+    as grouped by iter_grouped_positions.
+
+    The elements of a cell are only gathered as it is yielded.
+    """
+    if not isinstance(elements, Table):
+        elements = list(elements)
+    for group_key, combo_key, positions in iter_grouped_positions(
+        groups, elements, include_empty, rollup
+    ):
+        if isinstance(elements, Table):
+            yield group_key, combo_key, elements.take(positions)
+        else:
+            yield group_key, combo_key, [
+                elements[position]
+                for position in positions
             ]
-            grouped_elements[group_key][combo_key] = filtered_elements
 
+
+def group_elements(
+    groups: List[List[Filter]],
+    elements: Union[Table, Iterable[Union[Comparison, Record]]],
+    include_empty: bool = False,
+    rollup: bool = False
+) -> Dict[str, Dict[str, Union[Table, List[Union[Comparison, Record]]]]]:
+    """
+    Group elements together based on common properties.
+
+    Elements are bucketed in a single pass for each group,
+    so only combinations which have elements are returned,
+    unless include_empty asks for every combination of the values found.
+    With rollup, the subtotals of each group are added, e.g. "High income, Total".
+    Tables are grouped into smaller tables of the same type.
+    """
+    grouped_elements = {
+        ', '.join(filter_to_attr[f] for f in group): {}
+        for group in groups
+    }
+    for group_key, combo_key, cell in iter_grouped_elements(
+        groups, elements, include_empty, rollup
+    ):
+        grouped_elements[group_key][combo_key] = cell
     return grouped_elements
@@ -0,0 +1,206 @@
+"""
+incremental.py
+
+Keep the tables of a configuration up to date as new rows arrive.
+
+Only the models, i.e. each AUTHOR, COUNTRY and INTERVENTION,
+touched by the new rows have their records and comparisons recomputed,
+and only the tables holding those models are converted again.
+"""
+import os
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Set, Tuple, Union
+from .comparisons import create_comparisons, order_by_pairs
+from .convert import convert_elements_to_format, convert_groups_to_format
+from .groups import iter_grouped_positions
+from .ingest import read_records
+from .records import create_records, select_latest_records
+from .tables import KEY_COLUMNS, ComparisonTable, RecordTable, Table
+
+
+def _keys(df: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_frame(df[KEY_COLUMNS]).unique()
+
+
+def _key_positions(table: Table, keys: pd.MultiIndex, inside: bool = True) -> np.ndarray:
+    "The positions of the rows of a table whose key is, or is not, one of the keys."
+    columns = [table.key_column(column) for column in KEY_COLUMNS]
+    mask = pd.MultiIndex.from_frame(table.df[columns]).isin(keys)
+    return np.flatnonzero(mask if inside else ~mask)
+
+
+def _concat(table: Table, other: Table) -> Table:
+    "Join two tables of the same type, ordered by their index."
+    if not len(other):
+        return table
+    if not len(table):
+        return other
+    return type(table)(pd.concat([table.df, other.df]).sort_index(kind="stable"))
+
+
+class IncrementalTables:
+    """
+    The tables of a configuration, kept up to date as rows arrive.
+
+    Every record is indexed by its position in the data,
+    and every comparison by the position of its first record,
+    so updated elements are slotted back in the order
+    a full run of create_tables would produce them,
+    with the comparisons of each pair of scenarios kept together.
+
+    The current tables are held in tables, in the format
+    create_tables would return them.
+    """
+    def __init__(
+        self,
+        configuration: dict,
+        data: Union[pd.DataFrame, str, os.PathLike]
+    ):
+        from . import parse_configuration, parse_options
+        (
+            self.data_type,
+            self.data_format,
+            self.scenarios,
+            self.filters,
+            self.groups,
+        ) = parse_configuration(configuration)
+        self.options = parse_options(configuration)
+        if self.data_type not in ("records", "comparisons"):
+            raise ValueError(f"Unknown data type: {self.data_type}")
+
+        self._length = 0
+        if isinstance(data, pd.DataFrame):
+            self._records = self._create_records(data)
+        else:
+            records = read_records(
+                data,
+                self.scenarios,
+                self.filters,
+                chunksize=self.options["chunksize"]
+            )
+            self._records = self._index_records(records.df)
+        if not len(self._records):
+            raise ValueError("No records matched the filters provided.")
+
+        self.elements = self._create_elements(self._records)
+        self.tables = None
+        self._render()
+
+    def _index_records(self, df: pd.DataFrame) -> RecordTable:
+        "Index new records by their position in the data."
+        index = pd.RangeIndex(self._length, self._length + len(df))
+        self._length += len(df)
+        return RecordTable(df.set_axis(index))
+
+    def _create_records(self, rows: pd.DataFrame) -> RecordTable:
+        records = create_records(rows, self.scenarios, self.filters)
+        return self._index_records(records.df)
+
+    def _create_elements(
+        self,
+        records: RecordTable
+    ) -> Union[RecordTable, ComparisonTable]:
+        if self.options["latest_only"]:
+            records = select_latest_records(
+                records,
+                self.scenarios,
+                remove_unpaired=self.data_type == "comparisons",
+                pairing=self.options["pairing"]
+            )
+        if self.data_type == "records":
+            return records
+        return create_comparisons(
+            records, self.scenarios, pairing=self.options["pairing"]
+        )
+
+    def _order(self, elements: Union[RecordTable, ComparisonTable]):
+        "Put comparisons of several pairs of scenarios in the order of their pairs."
+        if self.data_type == "records" or len(self.scenarios) == 2:
+            return elements
+        return order_by_pairs(
+            elements, self.scenarios, self.options["pairing"], elements.df.index.to_numpy()
+        )
+
+    def update(self, rows: pd.DataFrame, replace: bool = False) -> List[str]:
+        """
+        Append rows to the data, or with replace, swap them in
+        for every row of the models they belong to.
+
+        Returns the keys of the tables which were converted again.
+        """
+        new_records = self._create_records(rows)
+        if replace:
+            changed = _keys(rows)
+            unchanged = self._records.take(
+                _key_positions(self._records, changed, inside=False)
+            )
+        else:
+            changed = _keys(new_records.df)
+            unchanged = self._records
+        self._records = _concat(unchanged, new_records)
+
+        old_elements = self.elements.take(_key_positions(self.elements, changed))
+        new_elements = self._create_elements(
+            self._records.take(_key_positions(self._records, changed))
+        )
+        self.elements = self._order(_concat(
+            self.elements.take(_key_positions(self.elements, changed, inside=False)),
+            new_elements
+        ))
+
+        if not len(old_elements) and not len(new_elements):
+            return []
+        if not self.groups:
+            return self._render()
+        return self._render(self._changed_cells([old_elements, new_elements]))
+
+    def _changed_cells(self, tables: List[Table]) -> Set[Tuple[str, str]]:
+        "The (group_key, combo_key) of every cell, and subtotal, holding any element of the tables."
+        return {
+            (group_key, combo_key)
+            for table in tables
+            for group_key, combo_key, _ in iter_grouped_positions(
+                self.groups, table, rollup=self.options["rollup"]
+            )
+        }
+
+    def _render(self, changed: Optional[Set[Tuple[str, str]]] = None) -> List[str]:
+        """
+        Convert the tables holding changed cells, or every table,
+        and reuse the rest. Returns the keys of the tables converted.
+        """
+        if not self.groups:
+            self.tables = convert_elements_to_format(
+                self.elements,
+                format=self.data_format,
+                annotation=self.data_format
+            )
+            return [self.data_type]
+
+        previous = self.tables or {}
+        tables = {}
+        stale = {}
+        for group_key, combo_key, positions in iter_grouped_positions(
+            self.groups,
+            self.elements,
+            include_empty=self.options["include_empty_groups"],
+            rollup=self.options["rollup"]
+        ):
+            key = f"{group_key}_{combo_key}"
+            if changed is None or (group_key, combo_key) in changed or key not in previous:
+                stale.setdefault(group_key, {})[combo_key] = self.elements.take(positions)
+                tables[key] = None
+            else:
+                tables[key] = previous[key]
+
+        converted = convert_groups_to_format(
+            stale,
+            format=self.data_format,
+            annotation=self.data_format,
+            workers=self.options["workers"],
+            executor=self.options["executor"]
+        )
+        tables.update(converted)
+        self.tables = tables
+        return list(converted)
@@ -0,0 +1,60 @@
+"""
+ingest.py
+
+Read data sources with the schema of a Record into RecordTables.
+"""
+import os
+import pandas as pd
+from .arrow import read_arrow_data, source_format
+from .datatypes import Filter
+from .records import _filter_mask
+from .tables import INPUT_COLUMNS, RecordTable
+from typing import Dict, List, Optional, Tuple, Union
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def read_records(
+    filepath: Union[str, os.PathLike],
+    scenarios: Optional[Tuple[str]] = None,
+    filters: Optional[Dict[Filter, List[str]]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE
+) -> RecordTable:
+    """
+    Stream a CSV file into a RecordTable, one chunk at a time.
+
+    Each chunk is reduced to the columns of a Record and to the rows
+    matching the scenarios and filters before the next one is read,
+    so memory depends on the size of the selection, not of the file.
+
+    Parquet and Arrow IPC files, recognised by their extension,
+    are read with the same projection and filters pushed into the scan.
+    """
+    if source_format(filepath):
+        df = read_arrow_data(filepath, INPUT_COLUMNS, scenarios, filters)
+        if scenarios is not None or filters:
+            df = df[_filter_mask(df, scenarios, filters)]
+        return RecordTable.from_dataframe(df)
+
+    header = pd.read_csv(filepath, nrows=0).columns
+    usecols = [column for column in INPUT_COLUMNS if column in header]
+
+    chunks = []
+    reader = pd.read_csv(
+        filepath,
+        usecols=usecols,
+        keep_default_na=False,
+        chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            if scenarios is not None or filters:
+                chunk = chunk[_filter_mask(chunk, scenarios, filters)]
+            if len(chunk):
+                chunks.append(chunk)
+
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=usecols)
+    return RecordTable.from_dataframe(df)
@@ -0,0 +1,97 @@
+"""
+profiling.py
+
+Measure each stage of the pipeline:
+its wall time, the rows into and out of it, and its peak allocated memory.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional
+
+
+@dataclass(slots=True)
+class StageStats:
+    stage: str
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    seconds: float = 0.0
+    peak_bytes: Optional[int] = None
+
+
+class PipelineStats:
+    """
+    The measurements of each stage of a call, in the order they ran.
+
+    A callback, if given, is called with the StageStats of each stage
+    as soon as it finishes. Measuring memory traces every allocation
+    with tracemalloc, which slows the stages down, so it can be turned off.
+    """
+    def __init__(
+        self,
+        callback: Optional[Callable[[StageStats], None]] = None,
+        memory: bool = True
+    ):
+        self.callback = callback
+        self.memory = memory
+        self.stages: List[StageStats] = []
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageStats]:
+        "Measure the block within, which sets rows_out on the StageStats yielded."
+        stats = StageStats(name, rows_in=rows_in)
+        tracing = self.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds = time.perf_counter() - start
+            if self.memory:
+                _, peak = tracemalloc.get_traced_memory()
+                stats.peak_bytes = peak - before
+            if tracing:
+                tracemalloc.stop()
+            self.stages.append(stats)
+            if self.callback is not None:
+                self.callback(stats)
+
+    @property
+    def seconds(self) -> float:
+        return sum(stats.seconds for stats in self.stages)
+
+    def report(self) -> str:
+        "A table of the measurements of each stage."
+        def show(value, width, spec=""):
+            if value is None:
+                return f"{'-':>{width}}"
+            return f"{value:>{width}{spec}}"
+
+        lines = [f"{'stage':<16}{'seconds':>10}{'rows in':>12}{'rows out':>12}{'peak MiB':>10}"]
+        for stats in self.stages:
+            peak = None if stats.peak_bytes is None else stats.peak_bytes / 2**20
+            lines.append(
+                f"{stats.stage:<16}"
+                f"{stats.seconds:>10.4f}"
+                f"{show(stats.rows_in, 12)}"
+                f"{show(stats.rows_out, 12)}"
+                f"{show(peak, 10, '.1f')}"
+            )
+        lines.append(f"{'total':<16}{self.seconds:>10.4f}")
+        return "\n".join(lines)
+
+
+def measure(
+    stats: Optional[PipelineStats],
+    name: str,
+    rows_in: Optional[int] = None
+):
+    "Measure a stage with stats, or do nothing, cheaply, without them."
+    if stats is None:
+        return nullcontext(StageStats(name))
+    return stats.stage(name, rows_in)
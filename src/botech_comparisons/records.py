@@ -3,54 +3,120 @@ records.py
 
 Given a blueprint, return the records which actually appear in the data source.
 """
+import numpy as np
 import pandas as pd
+from .comparisons import scenario_pairs
+from .countries import TAG_COLUMNS, TAG_SOURCES, country_index
 from .datatypes import Record, Filter
-from typing import List, Tuple, Dict, Optional
-
-
-def create_records(df: pd.DataFrame) -> List[Record]:
-    records = []
-    for _, row in df.iterrows():
-        uid = row.get("UID", None)
-        record = Record(
-            UID=uid,
-            AUTHOR=row["AUTHOR"],
-            COUNTRY=row["COUNTRY"],
-            INTERVENTION=row["INTERVENTION"],
-            SCENARIO=row["SCENARIO"],
-            TIMESTAMP=row["TIMESTAMP"],
-            EFFECTS=row["EFFECTS"],
-            COSTS=row["COSTS"],
-        )
-        records.append(record)
-    return records
-
-
-def _remove_invalid_comparisons(df: pd.DataFrame, scenarios: Tuple[str]):
+from .tables import KEY_COLUMNS, RecordTable
+from typing import Iterable, List, Tuple, Dict, Optional, Union
+
+
+def _filter_mask(
+    df: pd.DataFrame,
+    scenarios: Optional[Tuple[str]] = None,
+    filters: Optional[Dict[Filter, List[str]]] = None
+) -> pd.Series:
+    """
+    Return which rows match the scenarios and every filter.
+
+    If the data has no tag columns yet, e.g. REGION,
+    the tag filters are resolved against the country index instead.
+    """
+    mask = pd.Series(True, index=df.index)
+    if scenarios is not None:
+        mask &= df["SCENARIO"].isin(scenarios)
+    for filter_type, values in (filters or {}).items():
+        column = filter_type.name
+        if column in df:
+            mask &= df[column].isin(values)
+        elif column in TAG_COLUMNS:
+            mask &= country_index.row_mask(df["COUNTRY"], TAG_SOURCES[column], values)
+    return mask
+
+
+def create_records(
+    df: pd.DataFrame,
+    scenarios: Optional[Tuple[str]] = None,
+    filters: Optional[Dict[Filter, List[str]]] = None
+) -> RecordTable:
+    """
+    Convert data with the schema of a Record into a RecordTable.
+
+    If scenarios or filters are provided, rows which do not match them
+    are dropped before the table is built.
+    Records are only built when the table is iterated over.
+    """
+    if scenarios is not None or filters:
+        df = df[_filter_mask(df, scenarios, filters)]
+    return RecordTable.from_dataframe(df)
+
+
+def _remove_invalid_comparisons(
+    df: pd.DataFrame,
+    scenarios: Tuple[str],
+    pairing: Optional[str] = None
+):
     """
     For each AUTHOR, COUNTRY, INTERVENTION,
-    if both scenarios are not present, remove those rows.
-    Keep only the most recent entry for each scenario.
+    if both scenarios of at least one pair are not present, remove those rows.
     """
-    scenario_one, scenario_two = scenarios
-    df = df.groupby(['AUTHOR', 'COUNTRY', 'INTERVENTION'])
-    df = df.filter(lambda x: (x['SCENARIO'] == scenario_one).any() and (x['SCENARIO'] == scenario_two).any())
-    return df
+    keys = pd.MultiIndex.from_frame(df[KEY_COLUMNS])
+    has_scenario = {
+        scenario: keys.isin(keys[(df["SCENARIO"] == scenario).to_numpy()])
+        for scenario in scenarios
+    }
+    paired = np.zeros(len(df), dtype=bool)
+    for scenario_one, scenario_two in scenario_pairs(scenarios, pairing):
+        paired |= has_scenario[scenario_one] & has_scenario[scenario_two]
+    return df[paired]
 
 
 def _remove_older_entries(df: pd.DataFrame):
-    df["TIMESTAMP"] = pd.to_datetime(df["TIMESTAMP"])
-    df = df.groupby(['AUTHOR', 'COUNTRY', 'INTERVENTION', 'SCENARIO'])
-    df = df.apply(lambda x: x.nlargest(1, 'TIMESTAMP'))
-    df = df.reset_index(drop=True)
-    return df
+    """
+    For each AUTHOR, COUNTRY, INTERVENTION, SCENARIO,
+    keep only the entry with the most recent TIMESTAMP.
+
+    Ties go to the entry which appears last in the data,
+    and the entries which remain keep the order of the data.
+    """
+    timestamps = pd.to_datetime(df["TIMESTAMP"]).reset_index(drop=True)
+    order = timestamps.sort_values(kind="stable", na_position="first").index.to_numpy()
+    keys = df[KEY_COLUMNS + ["SCENARIO"]].iloc[order]
+    latest = order[~keys.duplicated(keep="last").to_numpy()]
+    return df.iloc[np.sort(latest)]
+
+
+def select_latest_records(
+    records: RecordTable,
+    scenarios: Tuple[str],
+    remove_unpaired: bool = True,
+    pairing: Optional[str] = None
+) -> RecordTable:
+    """
+    Keep only the latest run of each model, and if remove_unpaired,
+    only the models which have been run for both scenarios of a pair.
+    """
+    df = _remove_older_entries(records.df)
+    if remove_unpaired:
+        df = _remove_invalid_comparisons(df, scenarios, pairing)
+    return RecordTable(df)
 
 
 def filter_records(
-    records: List[Record],
+    records: Union[RecordTable, Iterable[Record]],
     scenarios: Tuple[str],
     filters: Optional[Dict[Filter, List[str]]] = None
-) -> List[Record]:
+) -> Union[RecordTable, List[Record]]:
+    """
+    Keep the records of the scenarios which match every filter.
+
+    Tables are filtered with vectorized masks, and remain tables.
+    """
+    if isinstance(records, RecordTable):
+        mask = _filter_mask(records.df, scenarios, filters)
+        return records.take(np.flatnonzero(mask.to_numpy()))
+
     filtered_records = []
     for record in records:
         if record.SCENARIO not in scenarios:
@@ -0,0 +1,211 @@
+"""
+server.py
+
+Serve create_tables over a local socket, keeping the data warm.
+
+The data file is parsed and enriched once, and again only when it changes.
+Each request is a line of configuration JSON, as given to create_tables,
+and each response is a line of JSON, either {"result": ...} or {"error": ...}.
+A request of {"command": "statistics"} reports on the server instead.
+
+Tables are created on a pool of threads, so the event loop
+keeps accepting requests while a table is rendered.
+"""
+import asyncio
+import base64
+import json
+import math
+import os
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Optional, Tuple, Union
+from . import create_tables
+from .cache import ResultCache, data_fingerprint
+from .ingest import DEFAULT_CHUNKSIZE, read_records
+from .tables import RecordTable
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Requests are single lines of JSON, responses can be much longer
+REQUEST_LIMIT = 2**20
+
+
+def _finite(value):
+    "Replace infinite and NaN floats with None, as to_json does."
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _to_json(result):
+    "Make a result of create_tables serializable as JSON."
+    if isinstance(result, dict):
+        return {key: _to_json(value) for key, value in result.items()}
+    if isinstance(result, bytes):
+        return base64.b64encode(result).decode("ascii")
+    if isinstance(result, pd.DataFrame):
+        return json.loads(result.to_json(orient="split", index=False))
+    if isinstance(result, list):
+        return [_finite(asdict(element)) for element in result]
+    return result
+
+
+def _encode(response: dict) -> bytes:
+    "A line of strict JSON, with values JSON has no type for, e.g. datetimes, as strings."
+    return json.dumps(response, allow_nan=False, default=str).encode("utf-8") + b"\n"
+
+
+class TableServer:
+    """
+    Holds the records of a data file in memory, and answers
+    configurations against them from a ResultCache.
+
+    The file is polled every poll_interval seconds,
+    and reloaded if its size or modification time changed.
+    """
+    def __init__(
+        self,
+        data_filepath: Union[str, os.PathLike],
+        cache: Optional[ResultCache] = None,
+        workers: int = 1,
+        poll_interval: float = 1.0,
+        chunksize: int = DEFAULT_CHUNKSIZE
+    ):
+        self.data_filepath = data_filepath
+        self.cache = ResultCache() if cache is None else cache
+        self.poll_interval = poll_interval
+        self.chunksize = chunksize
+        self.reloads = 0
+        self.reload_errors = 0
+        self.requests = 0
+        # The records and their fingerprint are swapped together
+        self._data: Optional[Tuple[RecordTable, str]] = None
+        self._stat = None
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._watcher: Optional[asyncio.Task] = None
+
+    def _file_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.data_filepath)
+        return stat.st_size, stat.st_mtime_ns
+
+    def load(self):
+        "Parse and enrich every record of the data file."
+        # Stat first, so a change during the read is seen by the next poll
+        stat = self._file_stat()
+        fingerprint = data_fingerprint(self.data_filepath)
+        records = read_records(self.data_filepath, chunksize=self.chunksize)
+        self._data = (records, fingerprint)
+        self._stat = stat
+        self.cache.clear()
+        self.reloads += 1
+
+    def create_tables(self, configuration: dict):
+        "Answer a configuration from the records in memory."
+        records, fingerprint = self._data
+        return create_tables(
+            configuration,
+            records,
+            cache=self.cache,
+            fingerprint=fingerprint
+        )
+
+    def statistics(self) -> dict:
+        return {
+            "data_filepath": os.fspath(self.data_filepath),
+            "records": len(self._data[0]) if self._data else 0,
+            "requests": self.requests,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "cache": self.cache.statistics(),
+        }
+
+    async def _respond(self, line: bytes) -> bytes:
+        loop = asyncio.get_running_loop()
+        try:
+            configuration = json.loads(line)
+            if configuration.get("command") == "statistics":
+                return _encode({"result": self.statistics()})
+            self.requests += 1
+            result = await loop.run_in_executor(
+                self._executor, self.create_tables, configuration
+            )
+            # Encoded here, so a result which cannot be is reported as an error
+            return _encode({"result": _to_json(result)})
+        except Exception as error:
+            return _encode({"error": f"{type(error).__name__}: {error}"})
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                writer.write(await self._respond(line))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                changed = self._file_stat() != self._stat
+            except FileNotFoundError:
+                # Mid replace, or removed: keep serving what was loaded
+                continue
+            if not changed:
+                continue
+            try:
+                await loop.run_in_executor(self._executor, self.load)
+            except Exception:
+                # e.g. read mid rewrite: keep serving what was loaded,
+                # and as the stat is unchanged, retry at the next poll
+                self.reload_errors += 1
+
+    async def start(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        path: Optional[str] = None
+    ) -> asyncio.AbstractServer:
+        """
+        Load the data, and listen on a Unix socket at path,
+        or otherwise on host and port.
+        """
+        loop = asyncio.get_running_loop()
+        if self._data is None:
+            await loop.run_in_executor(self._executor, self.load)
+        if path is not None:
+            server = await asyncio.start_unix_server(
+                self._handle, path=path, limit=REQUEST_LIMIT
+            )
+        else:
+            server = await asyncio.start_server(
+                self._handle, host, port, limit=REQUEST_LIMIT
+            )
+        self._watcher = asyncio.create_task(self._watch())
+        return server
+
+    async def serve(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        path: Optional[str] = None
+    ):
+        "Serve until cancelled."
+        server = await self.start(host, port, path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,256 @@
+"""
+sharded.py
+
+Run the stages of create_tables before grouping on a pool of processes.
+
+Every stage before grouping is independent for each model,
+i.e. each AUTHOR, COUNTRY and INTERVENTION, so the rows are hash-partitioned
+by model into shards. Each shard is filtered, has its latest runs selected
+and its records compared on a process of its own,
+and the shards are merged back in the order a single process would give.
+
+The columns reach the processes through shared memory, rather than pickled:
+numeric columns as they are, others as integer codes into their unique values.
+"""
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple, Union
+from .comparisons import create_comparisons, order_by_pairs
+from .datatypes import Filter
+from .records import _filter_mask, select_latest_records
+from .tables import KEY_COLUMNS, INPUT_COLUMNS, ComparisonTable, RecordTable
+
+# Below this many rows per shard, a process costs more than it saves
+MIN_ROWS_PER_SHARD = 10_000
+
+
+@dataclass
+class SharedColumn:
+    """
+    A column in a block of shared memory.
+
+    Columns which are not numeric are held as codes,
+    and their unique values, and missing value, are sent with the column.
+    """
+    column: str
+    name: str
+    dtype: np.dtype
+    uniques: Optional[pd.Index] = None
+    missing: object = None
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufmM"
+
+
+def _share(values: np.ndarray, blocks: List[SharedMemory]) -> str:
+    "Copy an array into a new block of shared memory, and return its name."
+    # A block cannot be empty
+    block = SharedMemory(create=True, size=max(values.nbytes, 1))
+    blocks.append(block)
+    np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+    return block.name
+
+
+def _share_frame(
+    df: pd.DataFrame,
+    order: np.ndarray,
+    blocks: List[SharedMemory]
+) -> List[SharedColumn]:
+    "Share the columns of a data frame, with its rows in the given order."
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        if _is_numeric(series):
+            values = series.to_numpy()[order]
+            columns.append(SharedColumn(column, _share(values, blocks), values.dtype))
+            continue
+        codes, uniques = pd.factorize(series)
+        # e.g. None stays None, rather than becoming NaN
+        missing = series[codes < 0].iloc[0] if (codes < 0).any() else None
+        values = codes[order]
+        columns.append(SharedColumn(
+            column, _share(values, blocks), values.dtype, pd.Index(uniques), missing
+        ))
+    return columns
+
+
+def _decode(column: SharedColumn, codes: np.ndarray):
+    "The values of a column held as codes."
+    if column.uniques.dtype != object:
+        if not len(column.uniques):
+            return pd.array([column.missing] * len(codes), dtype=column.uniques.dtype)
+        # Without a fill_value, a code of -1 would be read as the last value
+        return column.uniques.take(codes, allow_fill=True, fill_value=column.missing)
+    values = np.empty(len(codes), dtype=object)
+    found = codes >= 0
+    values[found] = column.uniques.to_numpy()[codes[found]]
+    values[~found] = column.missing
+    return values
+
+
+def _read_shared(name: str, dtype: np.dtype, start: int, stop: int) -> np.ndarray:
+    "Copy the rows start to stop out of a block of shared memory."
+    block = SharedMemory(name=name)
+    try:
+        view = np.ndarray((stop,), dtype=dtype, buffer=block.buf)
+        values = view[start:stop].copy()
+        del view
+    finally:
+        block.close()
+    return values
+
+
+def _attach_frame(
+    columns: List[SharedColumn],
+    positions: str,
+    start: int,
+    stop: int
+) -> pd.DataFrame:
+    "Rebuild the rows start to stop of a shared data frame, indexed by position."
+    data = {}
+    for column in columns:
+        values = _read_shared(column.name, column.dtype, start, stop)
+        if column.uniques is not None:
+            values = _decode(column, values)
+        data[column.column] = values
+    index = pd.Index(_read_shared(positions, np.dtype(np.int64), start, stop))
+    return pd.DataFrame(data, index=index)
+
+
+def _process_shard(
+    df: pd.DataFrame,
+    enrich: bool,
+    data_type: str,
+    scenarios: Tuple[str],
+    filters: Optional[Dict[Filter, List[str]]],
+    latest_only: bool,
+    pairing: Optional[str]
+) -> Tuple[np.ndarray, Optional[pd.DataFrame]]:
+    """
+    Filter the rows of a shard, indexed by their position in the data,
+    and select and compare their records as a single process would.
+
+    Returns the positions of the rows which matched the filters,
+    and the elements, which keep the positions of their records.
+    """
+    df = df[_filter_mask(df, scenarios, filters).to_numpy()]
+    if not len(df):
+        return df.index.to_numpy(), None
+    if enrich:
+        records = RecordTable(RecordTable.from_dataframe(df).df.set_axis(df.index))
+    else:
+        records = RecordTable(df)
+
+    if latest_only:
+        records = select_latest_records(
+            records,
+            scenarios,
+            remove_unpaired=data_type in ("comparisons", "summaries"),
+            pairing=pairing
+        )
+    if data_type == "records":
+        return df.index.to_numpy(), records.df
+    return df.index.to_numpy(), create_comparisons(records, scenarios, pairing=pairing).df
+
+
+def _run_shard(
+    columns: List[SharedColumn],
+    positions: str,
+    start: int,
+    stop: int,
+    *arguments
+) -> Tuple[np.ndarray, Optional[pd.DataFrame]]:
+    return _process_shard(_attach_frame(columns, positions, start, stop), *arguments)
+
+
+def create_sharded_elements(
+    data: Union[pd.DataFrame, RecordTable],
+    data_type: str,
+    scenarios: Tuple[str],
+    filters: Optional[Dict[Filter, List[str]]],
+    latest_only: bool,
+    pairing: Optional[str],
+    shards: int
+) -> Union[RecordTable, ComparisonTable]:
+    """
+    Create the records or comparisons of data rows, or of a RecordTable,
+    on up to shards processes.
+
+    The rows of each model are sent to the same shard, by a hash of its key,
+    so a model's latest run and comparisons are found within its shard.
+    The result, and its index, are those of a single process.
+    """
+    enrich = isinstance(data, pd.DataFrame)
+    df = data if enrich else data.df
+    if enrich:
+        df = df[[column for column in INPUT_COLUMNS if column in df]]
+    arguments = (enrich, data_type, scenarios, filters, latest_only, pairing)
+
+    shards = min(shards, len(df) // MIN_ROWS_PER_SHARD)
+    if shards <= 1:
+        results = [_process_shard(df.set_axis(pd.RangeIndex(len(df))), *arguments)]
+    else:
+        shard_of_row = pd.util.hash_pandas_object(
+            df[KEY_COLUMNS], index=False
+        ).to_numpy() % np.uint64(shards)
+        shard_of_row = shard_of_row.astype(np.intp)
+        order = np.argsort(shard_of_row, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(shard_of_row, minlength=shards))])
+
+        blocks = []
+        try:
+            columns = _share_frame(df, order, blocks)
+            positions = _share(order.astype(np.int64), blocks)
+            with ProcessPoolExecutor(max_workers=shards) as pool:
+                futures = [
+                    pool.submit(_run_shard, columns, positions, start, stop, *arguments)
+                    for start, stop in zip(bounds[:-1], bounds[1:])
+                    if stop > start
+                ]
+                results = [future.result() for future in futures]
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    return _merge_shards(results, data, data_type, scenarios, pairing)
+
+
+def _merge_shards(
+    results: List[Tuple[np.ndarray, Optional[pd.DataFrame]]],
+    data: Union[pd.DataFrame, RecordTable],
+    data_type: str,
+    scenarios: Tuple[str],
+    pairing: Optional[str]
+) -> Union[RecordTable, ComparisonTable]:
+    """
+    Join the elements of every shard, in the order of the data,
+    and give them the index a single process would.
+    """
+    frames = [elements for _, elements in results if elements is not None]
+    if not frames:
+        raise ValueError("No records matched the filters provided.")
+    table_type = RecordTable if data_type == "records" else ComparisonTable
+    if len(frames) == 1:
+        # A single shard is already in order
+        elements = table_type(frames[0])
+    elif data_type == "records":
+        elements = RecordTable(pd.concat(frames).sort_index(kind="stable"))
+    else:
+        df = pd.concat(frames)
+        elements = order_by_pairs(
+            ComparisonTable(df), scenarios, pairing, df.index.to_numpy()
+        )
+
+    positions = elements.df.index.to_numpy()
+    if isinstance(data, pd.DataFrame):
+        # Records made from data rows are numbered among the rows which matched
+        matched = np.sort(np.concatenate([matched for matched, _ in results]))
+        labels = pd.Index(np.searchsorted(matched, positions))
+    else:
+        labels = data.df.index[positions]
+    return type(elements)(elements.df.set_axis(labels))
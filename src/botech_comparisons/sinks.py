@@ -0,0 +1,91 @@
+"""
+sinks.py
+
+Write tables straight to files, one table at a time,
+so that no table is held in memory as a string.
+"""
+import io
+import os
+import re
+import zipfile
+from typing import IO, Iterable, List, Tuple, Union
+from .arrow import write_dataframe
+from .convert import _to_table
+from .tables import Table
+
+EXTENSIONS = {
+    "csv": "csv",
+    "html": "html",
+    "parquet": "parquet",
+    "arrow": "arrow",
+}
+BINARY_FORMATS = ["parquet", "arrow"]
+
+
+def _filename(key: str, format: str) -> str:
+    "A file name for a table, keeping the key readable."
+    if format not in EXTENSIONS:
+        raise ValueError(f"Format cannot be written to a file: {format}")
+    name = re.sub(r"[^\w\-., &()]", "_", key).strip() or "table"
+    return f"{name}.{EXTENSIONS[format]}"
+
+
+def write_elements(elements: Union[list, Table], format: str, file: IO):
+    "Render elements into an open file, binary for BINARY_FORMATS and text otherwise."
+    df = _to_table(elements).to_dataframe()
+    if format == "csv":
+        df.to_csv(file, index=False)
+    elif format == "html":
+        df.to_html(file, index=False)
+    elif format in BINARY_FORMATS:
+        write_dataframe(df, format, file)
+    else:
+        raise ValueError(f"Format cannot be written to a file: {format}")
+
+
+def write_elements_to_directory(
+    elements_by_key: Iterable[Tuple[str, Union[list, Table]]],
+    directory: Union[str, os.PathLike],
+    format: str
+) -> List[str]:
+    """
+    Write each table to its own file in a directory.
+
+    Returns the paths written, in the order of the tables.
+    """
+    os.makedirs(directory, exist_ok=True)
+    filepaths = []
+    for key, elements in elements_by_key:
+        filepath = os.path.join(directory, _filename(key, format))
+        if format in BINARY_FORMATS:
+            with open(filepath, "wb") as f:
+                write_elements(elements, format, f)
+        else:
+            with open(filepath, "w", encoding="utf-8", newline="") as f:
+                write_elements(elements, format, f)
+        filepaths.append(filepath)
+    return filepaths
+
+
+def write_elements_to_zip(
+    elements_by_key: Iterable[Tuple[str, Union[list, Table]]],
+    filepath: Union[str, os.PathLike],
+    format: str
+) -> List[str]:
+    """
+    Write each table to its own member of a zip archive.
+
+    Returns the member names written, in the order of the tables.
+    """
+    names = []
+    with zipfile.ZipFile(filepath, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for key, elements in elements_by_key:
+            name = _filename(key, format)
+            with archive.open(name, "w") as member:
+                if format in BINARY_FORMATS:
+                    write_elements(elements, format, member)
+                else:
+                    with io.TextIOWrapper(member, encoding="utf-8", newline="") as f:
+                        write_elements(elements, format, f)
+            names.append(name)
+    return names
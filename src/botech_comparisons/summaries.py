@@ -0,0 +1,119 @@
+"""
+summaries.py
+
+Summarise comparisons by the cells of each group,
+e.g. the total effects and costs, and pooled cost-effectiveness, of each region.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from .datatypes import Filter
+from .groups import TOTAL, GroupingSets, filter_to_attr
+from .tables import SUMMARY_COLUMNS, ComparisonTable, SummaryTable
+
+SUMMED_COLUMNS = [
+    "S1_EFFECTS",
+    "S1_COSTS",
+    "S2_EFFECTS",
+    "S2_COSTS",
+    "NET_EFFECTS",
+    "NET_COSTS",
+]
+PAIR_COLUMNS = ["S1_SCENARIO", "S2_SCENARIO"]
+
+
+def _partial_aggregates(df: pd.DataFrame, codes: np.ndarray) -> pd.DataFrame:
+    "The count, sums, min and max of each code, which merge into any coarser cell."
+    return df.groupby(codes).agg(
+        COUNT=("NET_EFFECTS", "size"),
+        **{column: (column, "sum") for column in SUMMED_COLUMNS},
+        MIN_COST_EFFECTIVENESS=("COST_EFFECTIVENESS", "min"),
+        MAX_COST_EFFECTIVENESS=("COST_EFFECTIVENESS", "max"),
+    )
+
+
+def _merge(
+    partial: pd.DataFrame,
+    cost_effectiveness: np.ndarray,
+    cell_codes: np.ndarray,
+    row_codes: np.ndarray
+) -> pd.DataFrame:
+    """
+    Merge the partial aggregates of the finest cells into coarser cells.
+    A median does not merge, so is taken over the rows of each coarser cell.
+    """
+    summary = partial.groupby(cell_codes).agg({
+        "COUNT": "sum",
+        **{column: "sum" for column in SUMMED_COLUMNS},
+        "MIN_COST_EFFECTIVENESS": "min",
+        "MAX_COST_EFFECTIVENESS": "max",
+    })
+    summary["MEDIAN_COST_EFFECTIVENESS"] = pd.Series(cost_effectiveness).groupby(row_codes).median()
+    return summary
+
+
+def summarise_groups(
+    comparisons: ComparisonTable,
+    groups: Optional[List[List[Filter]]],
+    rollup: bool = False
+) -> Dict[str, SummaryTable]:
+    """
+    Summarise the comparisons by each group, keyed by the attributes of the group,
+    with a row per cell and pair of scenarios, pair by pair,
+    and in the order the cells first appear within each pair.
+    Without groups, every comparison of a pair is summarised in one row,
+    under "summaries".
+
+    The comparisons are hashed and aggregated once, by their pair
+    and the finest grouping, and the aggregates merged into the cells of each group.
+    With rollup, each group is followed by its subtotals,
+    e.g. "High income, Total", and the total of every comparison.
+    """
+    arrangements = [[filter_to_attr[f] for f in group] for group in groups or [[]]]
+    df = comparisons.df
+    grouping_sets = GroupingSets(comparisons, arrangements)
+    # Comparisons of different pairs of scenarios are never totalled together
+    pair_codes = df.groupby(PAIR_COLUMNS, sort=False).ngroup().to_numpy()
+    _, first_rows = np.unique(pair_codes, return_index=True)
+    pairs = df[PAIR_COLUMNS].iloc[first_rows].to_numpy()
+    finest = len(grouping_sets.cells)
+    partial = _partial_aggregates(df, pair_codes * finest + grouping_sets.codes)
+    partial_pairs, partial_cells = np.divmod(partial.index.to_numpy(), max(finest, 1))
+    cost_effectiveness = df["COST_EFFECTIVENESS"].to_numpy()
+
+    summaries = {}
+    for attributes in arrangements:
+        widths = range(len(attributes), -1, -1) if rollup else [len(attributes)]
+        frames = []
+        for width in widths:
+            cell_codes, keys = grouping_sets.cell_codes(attributes[:width])
+            summary = _merge(
+                partial,
+                cost_effectiveness,
+                partial_pairs * len(keys) + cell_codes[partial_cells],
+                pair_codes * len(keys) + cell_codes[grouping_sets.codes]
+            )
+            pair, cell = np.divmod(summary.index.to_numpy(), len(keys))
+            summary = summary.reset_index(drop=True)
+            summary["PAIR"] = pair
+            summary["S1_SCENARIO"] = pairs[pair, 0]
+            summary["S2_SCENARIO"] = pairs[pair, 1]
+            summary["CELL"] = [
+                ', '.join(str(item) for item in keys[code] + (TOTAL,) * (len(attributes) - width))
+                or TOTAL
+                for code in cell
+            ]
+            frames.append(summary)
+
+        summary = pd.concat(frames, ignore_index=True)
+        # Each pair, with its subtotals, follows the pair before
+        summary = summary.sort_values("PAIR", kind="stable")
+        summary["GROUP"] = ', '.join(attributes)
+        # Pooled, rather than the mean of each comparison's cost-effectiveness
+        summary["COST_EFFECTIVENESS"] = (summary["NET_EFFECTS"] / summary["NET_COSTS"]).where(
+            summary["NET_COSTS"] != 0, float("inf")
+        )
+        summaries[', '.join(attributes) or "summaries"] = SummaryTable(
+            summary[SUMMARY_COLUMNS].reset_index(drop=True)
+        )
+    return summaries
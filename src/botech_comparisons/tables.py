@@ -0,0 +1,162 @@
+"""
+tables.py
+
+Columnar containers for our datastructures.
+
+A table keeps its elements as pandas columns,
+and only builds the python dataclasses when they are asked for.
+"""
+import pandas as pd
+from dataclasses import fields
+from typing import Iterable, Iterator, List, Sequence
+from .countries import TAG_SOURCES, resolver
+from .datatypes import Comparison, Record, Summary
+
+KEY_COLUMNS = ["AUTHOR", "COUNTRY", "INTERVENTION"]
+RECORD_COLUMNS = [f.name for f in fields(Record)]
+INPUT_COLUMNS = [f.name for f in fields(Record) if f.init]
+COMPARISON_FIELDS = ["NET_EFFECTS", "NET_COSTS", "COST_EFFECTIVENESS"]
+COMPARISON_COLUMNS = [
+    *[f"S1_{column}" for column in RECORD_COLUMNS],
+    *[f"S2_{column}" for column in RECORD_COLUMNS],
+    *COMPARISON_FIELDS,
+]
+SUMMARY_COLUMNS = [f.name for f in fields(Summary)]
+
+
+def create_country_tag_table(countries: Iterable[str]) -> pd.DataFrame:
+    """
+    One row per country, holding the tags a Record would resolve.
+    """
+    rows = [
+        (country, *resolver.get_tags(country))
+        for country in countries
+    ]
+    return pd.DataFrame(rows, columns=["COUNTRY", *TAG_SOURCES])
+
+
+class Table:
+    """
+    Behaviour shared by every table.
+
+    KEY_PREFIX is prepended to a Record attribute
+    to find the column that elements are grouped by.
+    """
+    KEY_PREFIX = ""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def key_column(self, attribute: str) -> str:
+        return f"{self.KEY_PREFIX}{attribute}"
+
+    def take(self, positions: Sequence[int]) -> "Table":
+        "Return a table of the rows at the given positions."
+        return type(self)(self.df.iloc[positions])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return self.df.reset_index(drop=True)
+
+
+class RecordTable(Table):
+    """
+    A columnar collection of Records.
+
+    The columns follow the schema of a Record,
+    including the REGION, INCOME and APPENDIX_3 tags.
+    """
+    @classmethod
+    def from_records(cls, records: Sequence[Record]) -> "RecordTable":
+        "Build a table from Records, one column at a time."
+        return cls(pd.DataFrame(
+            {
+                column: [getattr(record, column) for record in records]
+                for column in RECORD_COLUMNS
+            },
+            columns=RECORD_COLUMNS
+        ))
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "RecordTable":
+        """
+        Build a table from data with the schema of a Record.
+
+        The country tags are attached with a single join
+        against a lookup table of the unique countries.
+        """
+        uid = df["UID"] if "UID" in df else None
+        df = df[INPUT_COLUMNS[:-1]].assign(UID=uid)
+        lookup = create_country_tag_table(df["COUNTRY"].unique())
+        df = df.merge(lookup, on="COUNTRY", how="left", sort=False)
+        return cls(df[RECORD_COLUMNS])
+
+    def __iter__(self) -> Iterator[Record]:
+        columns = self.df[INPUT_COLUMNS]
+        for values in columns.itertuples(index=False, name=None):
+            yield Record(*values)
+
+    def to_records(self) -> List[Record]:
+        return list(self)
+
+
+class ComparisonTable(Table):
+    """
+    A columnar collection of Comparisons.
+
+    Each row holds both Records, with their columns prefixed
+    by S1_ and S2_, followed by the comparison specific fields.
+    Comparisons are grouped by the Record of the first scenario.
+    """
+    KEY_PREFIX = "S1_"
+
+    @classmethod
+    def from_comparisons(cls, comparisons: Sequence[Comparison]) -> "ComparisonTable":
+        "Build a table from Comparisons, one column at a time."
+        columns = {}
+        for prefix, scenario in [("S1_", "SCENARIO_ONE"), ("S2_", "SCENARIO_TWO")]:
+            records = [getattr(comparison, scenario) for comparison in comparisons]
+            for column in RECORD_COLUMNS:
+                columns[f"{prefix}{column}"] = [getattr(record, column) for record in records]
+        for column in COMPARISON_FIELDS:
+            columns[column] = [getattr(comparison, column) for comparison in comparisons]
+        return cls(pd.DataFrame(columns, columns=COMPARISON_COLUMNS))
+
+    def __iter__(self) -> Iterator[Comparison]:
+        s1_columns = [f"S1_{column}" for column in INPUT_COLUMNS]
+        s2_columns = [f"S2_{column}" for column in INPUT_COLUMNS]
+        columns = self.df[s1_columns + s2_columns]
+        width = len(INPUT_COLUMNS)
+        for values in columns.itertuples(index=False, name=None):
+            yield Comparison(
+                SCENARIO_ONE=Record(*values[:width]),
+                SCENARIO_TWO=Record(*values[width:])
+            )
+
+    def to_comparisons(self) -> List[Comparison]:
+        return list(self)
+
+
+class SummaryTable(Table):
+    """
+    A columnar collection of Summaries, one row per cell of a group.
+    """
+    @classmethod
+    def from_summaries(cls, summaries: Sequence[Summary]) -> "SummaryTable":
+        "Build a table from Summaries, one column at a time."
+        return cls(pd.DataFrame(
+            {
+                column: [getattr(summary, column) for summary in summaries]
+                for column in SUMMARY_COLUMNS
+            },
+            columns=SUMMARY_COLUMNS
+        ))
+
+    def __iter__(self) -> Iterator[Summary]:
+        for values in self.df[SUMMARY_COLUMNS].itertuples(index=False, name=None):
+            yield Summary(*values)
+
+    def to_summaries(self) -> List[Summary]:
+        return list(self)
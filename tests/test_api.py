@@ -2,7 +2,9 @@ import warnings
 import json
 import pandas as pd
 import unittest
-from src.botech_comparisons import create_tables
+from unittest import mock
+import src.botech_comparisons as botech_comparisons
+from src.botech_comparisons import create_tables, create_tables_many
 warnings.filterwarnings("ignore")
 
 
@@ -498,3 +500,63 @@ class TestAPI(unittest.TestCase):
         )
 
         self._assert(elements, DATA_FORMAT)
+
+
+class TestCreateTablesMany(unittest.TestCase):
+    load_configuration = TestAPI.load_configuration
+    setUp = TestAPI.setUp
+    _assert = TestAPI._assert
+
+    def test_matches_create_tables(self):
+        configurations = {}
+        for filepath in [
+            self.configfuration_with_nothing,
+            self.configfuration_with_everything,
+            self.configfuration_with_filters,
+            self.configfuration_with_groups,
+        ]:
+            for data_type in ["records", "comparisons"]:
+                for data_format in ["csv", "html"]:
+                    configurations[(filepath, data_type, data_format)] = self.load_configuration(
+                        filepath=filepath,
+                        data_type=data_type,
+                        data_format=data_format
+                    )
+
+        results = create_tables_many(configurations, self.mock_data)
+        assert list(results) == list(configurations)
+        for key, configuration in configurations.items():
+            assert results[key] == create_tables(configuration, self.mock_data)
+
+    def test_selections_are_shared(self):
+        configuration = self.load_configuration(
+            filepath=self.configfuration_with_filters,
+            data_type="records",
+            data_format="csv"
+        )
+        configurations = [
+            configuration,
+            {**configuration, "data_type": "comparisons"},
+            {**configuration, "data_type": "summaries"},
+            {**configuration, "data_type": "comparisons", "data_format": "html"},
+        ]
+        with mock.patch.object(
+            botech_comparisons, "filter_records", wraps=botech_comparisons.filter_records
+        ) as filter_records, mock.patch.object(
+            botech_comparisons, "create_comparisons", wraps=botech_comparisons.create_comparisons
+        ) as create_comparisons:
+            results = create_tables_many(configurations, self.mock_data)
+        assert filter_records.call_count == 1
+        assert create_comparisons.call_count == 1
+        for key, configuration in enumerate(configurations):
+            assert results[key] == create_tables(configuration, self.mock_data)
+
+    def test_list_of_configurations(self):
+        configuration = self.load_configuration(
+            filepath=self.configfuration_with_groups,
+            data_type="comparisons",
+            data_format="dataframe"
+        )
+        results = create_tables_many([configuration, configuration], "./tests/MOCK_DATA.csv")
+        assert list(results) == [0, 1]
+        self._assert(results[0], "dataframe")
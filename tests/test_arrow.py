@@ -0,0 +1,56 @@
+import warnings
+import importlib.util
+import io
+import os
+import tempfile
+import pandas as pd
+import unittest
+from src.botech_comparisons.convert import convert_elements_to_format
+from src.botech_comparisons.datatypes import Filter
+from src.botech_comparisons.ingest import read_records
+from src.botech_comparisons.records import create_records
+warnings.filterwarnings("ignore")
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+class TestArrow(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.directory = tempfile.TemporaryDirectory()
+        self.parquet_filepath = os.path.join(self.directory.name, "data.parquet")
+        self.arrow_filepath = os.path.join(self.directory.name, "data.arrow")
+        self.mock_data.to_parquet(self.parquet_filepath, row_group_size=100)
+        self.mock_data.to_feather(self.arrow_filepath)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read(self):
+        expected = create_records(self.mock_data).to_records()
+        for filepath in [self.parquet_filepath, self.arrow_filepath]:
+            assert read_records(filepath).to_records() == expected
+
+    def test_read_with_filters(self):
+        scenarios = (0, 1)
+        filters = {
+            Filter.INCOME: ["Low income"],
+            Filter.AUTHOR: [1, 2, 3],
+            Filter.INTERVENTION: ["0"],
+        }
+        expected = create_records(self.mock_data, scenarios, filters).to_records()
+        for filepath in [self.parquet_filepath, self.arrow_filepath]:
+            assert read_records(filepath, scenarios, filters).to_records() == expected
+
+        del filters[Filter.INTERVENTION]
+        expected = create_records(self.mock_data, scenarios, filters).to_records()
+        assert len(expected)
+        for filepath in [self.parquet_filepath, self.arrow_filepath]:
+            assert read_records(filepath, scenarios, filters).to_records() == expected
+
+    def test_write(self):
+        records = create_records(self.mock_data)
+        expected = convert_elements_to_format(records, "dataframe", "dataframe")
+        parquet = convert_elements_to_format(records, "parquet", "parquet")
+        arrow = convert_elements_to_format(records, "arrow", "arrow")
+        pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(parquet)), expected)
+        pd.testing.assert_frame_equal(pd.read_feather(io.BytesIO(arrow)), expected)
@@ -0,0 +1,72 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons import create_coverage_report
+from src.botech_comparisons.blueprint import create_blueprint, find_missing
+from src.botech_comparisons.datatypes import Filter
+warnings.filterwarnings("ignore")
+
+
+class TestBlueprint(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.small_data = pd.DataFrame({
+            "AUTHOR": [1, 1, 1, 2],
+            "COUNTRY": ["BR", "BR", "NL", "NL"],
+            "INTERVENTION": [0, 0, 0, 0],
+            "SCENARIO": [0, 1, 0, 1],
+            "TIMESTAMP": ["2023-01-01"] * 4,
+            "EFFECTS": [1.0] * 4,
+            "COSTS": [2.0] * 4,
+        })
+        self.filters = {Filter.COUNTRY: ["BR", "NL"]}
+
+    def test_blueprint_is_the_product(self):
+        blueprint = create_blueprint(self.mock_data, (0, 1), {Filter.REGION: ["North America"]})
+        assert isinstance(blueprint, pd.MultiIndex)
+        assert len(blueprint) == (
+            self.mock_data["AUTHOR"].nunique()
+            * len(blueprint.levels[1])
+            * self.mock_data["INTERVENTION"].nunique()
+            * 2
+        )
+
+    def test_blueprint_without_filters(self):
+        blueprint = create_blueprint(self.small_data, (0, 1))
+        assert {"BR", "NL"} <= set(blueprint.levels[1])
+
+    def test_missing_and_unpaired(self):
+        missing = find_missing(self.small_data, (0, 1), self.filters)
+        rows = set(
+            missing[["AUTHOR", "COUNTRY", "SCENARIO", "STATUS"]]
+            .itertuples(index=False, name=None)
+        )
+        assert rows == {
+            (1, "NL", 1, "unpaired"),
+            (2, "BR", 0, "missing"),
+            (2, "BR", 1, "missing"),
+            (2, "NL", 0, "unpaired"),
+        }
+        assert missing["REGION"].notna().all()
+
+    def test_coverage_report_by_group(self):
+        configuration = {
+            "data_type": "comparisons",
+            "data_format": "dataframe",
+            "scenarios": [0, 1],
+            "filters": {"country": ["BR", "NL"]},
+            "groups": [["author"]],
+        }
+        report = create_coverage_report(configuration, self.small_data)
+        assert list(report) == ["AUTHOR_1", "AUTHOR_2"]
+        assert len(report["AUTHOR_2"]) == 3
+
+    def test_finished_batch_has_nothing_to_report(self):
+        configuration = {
+            "data_type": "comparisons",
+            "data_format": "dataframe",
+            "scenarios": [0, 1],
+            "filters": {"country": ["BR"], "author": [1]},
+            "groups": [["region"]],
+        }
+        assert create_coverage_report(configuration, self.small_data) == {}
@@ -0,0 +1,145 @@
+import warnings
+import json
+import os
+import shutil
+import tempfile
+import pandas as pd
+import unittest
+from src.botech_comparisons import create_tables
+from src.botech_comparisons.cache import RecordCache, ResultCache
+from src.botech_comparisons.ingest import read_records
+warnings.filterwarnings("ignore")
+
+
+class TestRecordCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_filepath = os.path.join(self.directory.name, "data.csv")
+        shutil.copy("./tests/MOCK_DATA.csv", self.data_filepath)
+        self.cache = RecordCache(os.path.join(self.directory.name, "cache"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_store_and_load(self):
+        assert self.cache.load(self.data_filepath) is None
+        records = read_records(self.data_filepath)
+        self.cache.store(self.data_filepath, records)
+        cached = self.cache.load(self.data_filepath)
+        pd.testing.assert_frame_equal(cached.df, records.df)
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+    def test_touch_keeps_entry(self):
+        self.cache.store(self.data_filepath, read_records(self.data_filepath))
+        stat = os.stat(self.data_filepath)
+        os.utime(self.data_filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert self.cache.load(self.data_filepath) is not None
+
+    def test_change_invalidates_entry(self):
+        self.cache.store(self.data_filepath, read_records(self.data_filepath))
+        with open(self.data_filepath, "a") as f:
+            f.write("3,BR,0,0,2023-10-02,1.0,2.0\n")
+        assert self.cache.load(self.data_filepath) is None
+
+    def test_damaged_table_is_a_miss(self):
+        with open("./tests/configuration_with_everything.json") as f:
+            configuration = json.load(f)
+        configuration.update(data_type="comparisons", data_format="csv")
+        expected = create_tables(configuration, self.data_filepath)
+        configuration["cache_directory"] = self.cache.directory
+        create_tables(configuration, self.data_filepath)
+
+        _, _, table_path = self.cache._paths(self.data_filepath)
+        with open(table_path, "r+b") as f:
+            f.truncate(100)
+        assert self.cache.load(self.data_filepath) is None
+        # The run reads the source again, and stores a readable entry
+        assert create_tables(configuration, self.data_filepath) == expected
+        assert self.cache.load(self.data_filepath) is not None
+
+    def test_other_pandas_version_is_a_miss(self):
+        self.cache.store(self.data_filepath, read_records(self.data_filepath))
+        _, metadata_path, _ = self.cache._paths(self.data_filepath)
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        metadata["pandas"] = "0.0.0"
+        with open(metadata_path, "w") as f:
+            json.dump(metadata, f)
+        assert self.cache.load(self.data_filepath) is None
+
+    def test_create_tables_with_cache(self):
+        with open("./tests/configuration_with_everything.json") as f:
+            configuration = json.load(f)
+        configuration["data_type"] = "comparisons"
+        configuration["data_format"] = "csv"
+        expected = create_tables(configuration, self.data_filepath)
+
+        configuration["cache_directory"] = self.cache.directory
+        assert create_tables(configuration, self.data_filepath) == expected
+        assert create_tables(configuration, self.data_filepath) == expected
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.configuration = {
+            "data_type": "comparisons",
+            "data_format": "csv",
+            "scenarios": [0, 1],
+        }
+
+    def test_evicts_least_recently_used(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        assert "a" in cache and "c" in cache and "b" not in cache
+        assert cache.statistics()["evictions"] == 1
+
+    def test_bounded_by_bytes(self):
+        cache = ResultCache(max_bytes=1000)
+        cache.put("a", "x" * 600)
+        cache.put("b", "x" * 600)
+        assert len(cache) == 1 and "b" in cache
+        cache.put("c", "x" * 2000)
+        assert "c" not in cache
+        assert cache.bytes <= 1000
+
+    def test_repeated_configuration_is_a_hit(self):
+        cache = ResultCache()
+        first = create_tables(self.configuration, self.mock_data, cache=cache)
+        second = create_tables(self.configuration, self.mock_data, cache=cache)
+        assert first == second
+        assert first == create_tables(self.configuration, self.mock_data)
+        assert cache.hits == 1
+
+    def test_formats_share_elements(self):
+        cache = ResultCache()
+        create_tables(self.configuration, self.mock_data, cache=cache)
+        html = create_tables(
+            {**self.configuration, "data_format": "html"},
+            self.mock_data,
+            cache=cache
+        )
+        assert html == create_tables(
+            {**self.configuration, "data_format": "html"}, self.mock_data
+        )
+        # The second format misses its result, but hits the elements
+        assert cache.hits == 1
+
+    def test_changed_data_is_a_miss(self):
+        cache = ResultCache()
+        create_tables(self.configuration, self.mock_data, cache=cache)
+        changed = self.mock_data.assign(COSTS=self.mock_data["COSTS"] + 1)
+        result = create_tables(self.configuration, changed, cache=cache)
+        assert result == create_tables(self.configuration, changed)
+        assert cache.hits == 0
+
+    def test_results_are_copied(self):
+        cache = ResultCache()
+        configuration = {**self.configuration, "data_format": "dataframe"}
+        first = create_tables(configuration, self.mock_data, cache=cache)
+        first["NET_COSTS"] = 0
+        second = create_tables(configuration, self.mock_data, cache=cache)
+        assert not (second["NET_COSTS"] == 0).all()
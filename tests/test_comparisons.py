@@ -0,0 +1,72 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons.comparisons import create_comparisons
+from src.botech_comparisons.datatypes import Comparison
+from src.botech_comparisons.records import create_records
+from src.botech_comparisons.tables import COMPARISON_COLUMNS, ComparisonTable
+warnings.filterwarnings("ignore")
+
+
+class TestComparisons(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.small_data = pd.DataFrame({
+            "AUTHOR": [1, 1, 1, 1, 2],
+            "COUNTRY": ["BR", "BR", "BR", "MZ", "MZ"],
+            "INTERVENTION": [0, 0, 0, 0, 0],
+            "SCENARIO": [0, 1, 1, 0, 1],
+            "TIMESTAMP": ["2023-01-01"] * 5,
+            "EFFECTS": [1.0, 3.0, 5.0, 1.0, 2.0],
+            "COSTS": [2.0, 6.0, 9.0, 4.0, 4.0],
+        })
+
+    def test_matches_comparison_dataclass(self):
+        table = create_comparisons(create_records(self.mock_data), (0, 1))
+        assert isinstance(table, ComparisonTable)
+        assert list(table.df.columns) == COMPARISON_COLUMNS
+        for comparison, (_, row) in zip(table, table.df.iterrows()):
+            assert isinstance(comparison, Comparison)
+            assert comparison.NET_EFFECTS == row["NET_EFFECTS"]
+            assert comparison.NET_COSTS == row["NET_COSTS"]
+            assert comparison.COST_EFFECTIVENESS == row["COST_EFFECTIVENESS"]
+
+    def test_first_duplicate_wins(self):
+        table = create_comparisons(create_records(self.small_data), (0, 1))
+        assert len(table) == 1
+        assert table.df["S2_EFFECTS"].tolist() == [3.0]
+        assert table.df["COST_EFFECTIVENESS"].tolist() == [0.5]
+
+    def test_zero_net_costs(self):
+        data = self.small_data.assign(COSTS=1.0)
+        table = create_comparisons(create_records(data), (0, 1))
+        assert table.df["COST_EFFECTIVENESS"].tolist() == [float("inf")]
+
+    def test_reference_pairing(self):
+        data = pd.concat([
+            self.small_data,
+            self.small_data[self.small_data["SCENARIO"] == 1].assign(SCENARIO=2, COSTS=7.0),
+        ])
+        table = create_comparisons(create_records(data), (0, 1, 2), pairing="reference")
+        pairs = table.df[["S1_SCENARIO", "S2_SCENARIO"]].drop_duplicates()
+        assert pairs.values.tolist() == [[0, 1], [0, 2]]
+        # Each pair matches the comparisons of those two scenarios alone
+        for one, two in [(0, 1), (0, 2)]:
+            expected = create_comparisons(create_records(data), (one, two))
+            pair = table.df[table.df["S2_SCENARIO"] == two]
+            assert pair["COST_EFFECTIVENESS"].tolist() == expected.df["COST_EFFECTIVENESS"].tolist()
+
+    def test_all_pairs(self):
+        data = pd.concat([
+            self.small_data,
+            self.small_data.assign(SCENARIO=2),
+        ])
+        table = create_comparisons(create_records(data), (0, 1, 2), pairing="all_pairs")
+        pairs = table.df[["S1_SCENARIO", "S2_SCENARIO"]].drop_duplicates()
+        assert pairs.values.tolist() == [[0, 1], [0, 2], [1, 2]]
+
+    def test_pairing_is_required_for_more_scenarios(self):
+        with self.assertRaises(ValueError):
+            create_comparisons(create_records(self.small_data), (0, 1, 2))
+        with self.assertRaises(ValueError):
+            create_comparisons(create_records(self.small_data), (0, 1), pairing="unknown")
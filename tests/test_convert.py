@@ -0,0 +1,54 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons.comparisons import create_comparisons
+from src.botech_comparisons.convert import (
+    convert_elements_to_format,
+    convert_groups_to_format,
+)
+from src.botech_comparisons.datatypes import Filter
+from src.botech_comparisons.groups import group_elements
+from src.botech_comparisons.records import create_records
+warnings.filterwarnings("ignore")
+
+
+class TestConvertGroups(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.grouped_elements = group_elements(
+            [[Filter.AUTHOR], [Filter.REGION, Filter.INCOME]],
+            create_records(self.mock_data)
+        )
+
+    def test_workers_keep_order(self):
+        serial = convert_groups_to_format(self.grouped_elements, "csv", "csv")
+        for executor in ["thread", "process"]:
+            parallel = convert_groups_to_format(
+                self.grouped_elements, "csv", "csv", workers=2, executor=executor
+            )
+            assert list(parallel) == list(serial)
+            assert parallel == serial
+
+    def test_unknown_executor(self):
+        with self.assertRaises(ValueError):
+            convert_groups_to_format(self.grouped_elements, "csv", "csv", executor="gpu")
+
+
+class TestConvertElements(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.records = create_records(self.mock_data)
+
+    def test_lists_match_tables(self):
+        comparisons = create_comparisons(self.records, (0, 1))
+        for table in [self.records, comparisons]:
+            elements = list(table)
+            for data_format in ["csv", "html"]:
+                assert (
+                    convert_elements_to_format(elements, data_format, data_format)
+                    == convert_elements_to_format(table, data_format, data_format)
+                )
+
+    def test_self_builds_dataclasses(self):
+        elements = convert_elements_to_format(self.records, "self", "self")
+        assert elements == self.records.to_records()
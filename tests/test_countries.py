@@ -0,0 +1,88 @@
+import warnings
+import country_metadata
+import pandas as pd
+import unittest
+from src.botech_comparisons.blueprint import _filter_countries
+from src.botech_comparisons.countries import (
+    TAG_SOURCES,
+    CountryIndex,
+    CountryTagResolver,
+)
+from src.botech_comparisons.datatypes import Filter
+warnings.filterwarnings("ignore")
+
+
+class TestCountryTagResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = CountryTagResolver()
+
+    def test_tags_match_country_metadata(self):
+        for country in list(country_metadata.countries)[:20]:
+            tags = self.resolver.get_tags(country.alpha2)
+            for value, tag in zip(tags, TAG_SOURCES.values()):
+                try:
+                    expected = country_metadata.get_tag(country.alpha2, tag)
+                except KeyError:
+                    expected = None
+                assert value == expected
+
+    def test_statistics(self):
+        country = next(iter(country_metadata.countries)).alpha2
+        self.resolver.get_tags(country)
+        self.resolver.get_tags(country)
+        self.resolver.get_tags("NOT A COUNTRY")
+        self.resolver.get_tags("NOT A COUNTRY")
+        statistics = self.resolver.statistics()
+        assert statistics["warm"]
+        assert statistics["hits"] == 3
+        assert statistics["misses"] == 1
+
+    def test_unknown_country(self):
+        assert self.resolver.get_tags("NOT A COUNTRY") == (None, None, None)
+        assert self.resolver.get_alpha2("NOT A COUNTRY") is None
+
+
+class TestCountryIndex(unittest.TestCase):
+    def setUp(self):
+        self.resolver = CountryTagResolver()
+        self.index = CountryIndex(self.resolver)
+        self.regions = list(country_metadata.get_countries_by_tags("region"))[:2]
+        self.incomes = list(country_metadata.get_countries_by_tags("income"))[:1]
+
+    def _countries_by_tags(self, tag_type, values):
+        mapping = country_metadata.get_countries_by_tags(tag_type)
+        return {country.alpha2 for value in values for country in mapping[value]}
+
+    def test_tag_mask_matches_country_metadata(self):
+        mask = self.index.tag_mask("region", self.regions)
+        assert set(self.index.countries[mask]) == self._countries_by_tags("region", self.regions)
+
+    def test_filter_countries_intersects_filters(self):
+        countries = _filter_countries({
+            Filter.REGION: self.regions,
+            Filter.INCOME: self.incomes,
+        })
+        expected = (
+            self._countries_by_tags("region", self.regions)
+            & self._countries_by_tags("income", self.incomes)
+        )
+        assert set(countries) == expected
+
+    def test_filter_countries_by_country(self):
+        country = next(iter(country_metadata.countries)).alpha2
+        countries = _filter_countries({Filter.COUNTRY: [country, "NOT A COUNTRY"]})
+        assert countries == [country]
+        assert len(_filter_countries(None)) == len(self.index)
+
+    def test_row_mask_matches_resolver(self):
+        countries = pd.Series(
+            [country.alpha2 for country in country_metadata.countries][:30]
+            + ["NOT A COUNTRY", None]
+        )
+        wb_regions = [self.resolver.get_tag(countries[0], "REGION")]
+        mask = self.index.row_mask(countries, "wb_region", wb_regions)
+        expected = [
+            country is not None and self.resolver.get_tag(country, "REGION") in wb_regions
+            for country in countries
+        ]
+        assert mask.tolist() == expected
@@ -0,0 +1,37 @@
+import warnings
+import unittest
+from src.botech_comparisons.datatypes import Comparison, Record
+warnings.filterwarnings("ignore")
+
+
+class TestDatatypes(unittest.TestCase):
+    def make_record(self, scenario: str, costs: float) -> Record:
+        return Record(
+            AUTHOR="".join(["author", "_1"]),
+            COUNTRY="".join(["B", "R"]),
+            INTERVENTION="".join(["intervention", "_1"]),
+            SCENARIO="".join(["scenario_", scenario]),
+            TIMESTAMP="2023-10-02",
+            EFFECTS=1.0,
+            COSTS=costs,
+        )
+
+    def test_records_are_slotted(self):
+        record = self.make_record("one", 1.0)
+        assert not hasattr(record, "__dict__")
+        with self.assertRaises(AttributeError):
+            record.NOT_A_FIELD = 1
+
+    def test_categorical_fields_are_shared(self):
+        one = self.make_record("one", 1.0)
+        two = self.make_record("one", 2.0)
+        assert one.AUTHOR is two.AUTHOR
+        assert one.COUNTRY is two.COUNTRY
+        assert one.INTERVENTION is two.INTERVENTION
+        assert one.SCENARIO is two.SCENARIO
+
+    def test_comparison(self):
+        comparison = Comparison(self.make_record("one", 1.0), self.make_record("two", 3.0))
+        assert not hasattr(comparison, "__dict__")
+        assert comparison.NET_COSTS == 2.0
+        assert comparison.COST_EFFECTIVENESS == 0.0
@@ -0,0 +1,61 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons.datatypes import Filter
+from src.botech_comparisons.groups import GroupingSets, group_elements
+from src.botech_comparisons.records import create_records
+warnings.filterwarnings("ignore")
+
+
+class TestGroups(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.table = create_records(self.mock_data)
+        self.groups = [[Filter.REGION, Filter.INCOME, Filter.AUTHOR]]
+
+    def test_tables_and_lists_agree(self):
+        by_table = group_elements(self.groups, self.table)
+        by_list = group_elements(self.groups, self.table.to_records())
+        for group_key, cells in by_list.items():
+            assert list(cells) == list(by_table[group_key])
+            for combo_key, elements in cells.items():
+                assert by_table[group_key][combo_key].to_records() == elements
+
+    def test_only_non_empty_cells(self):
+        grouped = group_elements(self.groups, self.table)
+        cells = grouped["REGION, INCOME, AUTHOR"]
+        assert all(len(elements) for elements in cells.values())
+        assert sum(len(elements) for elements in cells.values()) == len(self.table)
+
+    def test_include_empty(self):
+        grouped = group_elements(self.groups, self.table, include_empty=True)
+        cells = grouped["REGION, INCOME, AUTHOR"]
+        df = self.table.df
+        expected = (
+            df["REGION"].nunique(dropna=False)
+            * df["INCOME"].nunique(dropna=False)
+            * df["AUTHOR"].nunique(dropna=False)
+        )
+        assert len(cells) == expected
+        assert sum(len(elements) for elements in cells.values()) == len(self.table)
+
+    def test_grouping_sets_match_each_group(self):
+        arrangements = [["REGION", "INCOME"], ["INCOME"], ["AUTHOR", "REGION"], []]
+        grouping_sets = GroupingSets(self.table, arrangements)
+        for attributes in arrangements[:-1]:
+            expected = GroupingSets(self.table, [attributes]).index(attributes)
+            index = grouping_sets.index(attributes)
+            assert list(index) == list(expected)
+            for combo, positions in index.items():
+                assert positions.tolist() == expected[combo].tolist()
+        assert grouping_sets.index([])[()].tolist() == list(range(len(self.table)))
+
+    def test_rollup(self):
+        grouped = group_elements(self.groups, self.table, rollup=True)
+        cells = grouped["REGION, INCOME, AUTHOR"]
+        assert len(cells["Total, Total, Total"]) == len(self.table)
+        by_region = group_elements([[Filter.REGION]], self.table)["REGION"]
+        for region, elements in by_region.items():
+            assert cells[f"{region}, Total, Total"].to_records() == elements.to_records()
+        by_list = group_elements(self.groups, self.table.to_records(), rollup=True)
+        assert list(by_list["REGION, INCOME, AUTHOR"]) == list(cells)
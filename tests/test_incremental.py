@@ -0,0 +1,101 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons import IncrementalTables, create_tables
+warnings.filterwarnings("ignore")
+
+
+class TestIncrementalTables(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.data = self.mock_data.iloc[:800]
+        self.rows = self.mock_data.iloc[800:]
+        self.configuration = {
+            "data_type": "comparisons",
+            "data_format": "csv",
+            "scenarios": [0, 1],
+            "groups": [["region"], ["income", "region"]],
+        }
+
+    def test_append_matches_full_run(self):
+        for data_type in ["records", "comparisons"]:
+            configuration = {**self.configuration, "data_type": data_type}
+            tables = IncrementalTables(configuration, self.data)
+            tables.update(self.rows)
+            assert tables.tables == create_tables(configuration, self.mock_data)
+
+    def test_rollup_matches_full_run(self):
+        configuration = {**self.configuration, "rollup": True}
+        tables = IncrementalTables(configuration, self.data)
+        tables.update(self.rows)
+        assert "INCOME, REGION_Total, Total" in tables.tables
+        assert tables.tables == create_tables(configuration, self.mock_data)
+
+    def test_empty_groups_and_rollup_match_full_run(self):
+        configuration = {**self.configuration, "rollup": True, "include_empty_groups": True}
+        tables = IncrementalTables(configuration, self.data)
+        tables.update(self.rows)
+        expected = create_tables(configuration, self.mock_data)
+        assert list(tables.tables) == list(expected)
+        assert tables.tables == expected
+
+    def test_replace_matches_full_run(self):
+        configuration = {**self.configuration, "latest_only": True}
+        tables = IncrementalTables(configuration, self.mock_data)
+        rows = self.mock_data.iloc[:5].assign(COSTS=1.0)
+        tables.update(rows, replace=True)
+
+        keys = pd.MultiIndex.from_frame(rows[["AUTHOR", "COUNTRY", "INTERVENTION"]])
+        replaced = pd.MultiIndex.from_frame(
+            self.mock_data[["AUTHOR", "COUNTRY", "INTERVENTION"]]
+        ).isin(keys)
+        data = pd.concat([self.mock_data[~replaced], rows])
+        assert tables.tables == create_tables(configuration, data)
+
+    def test_only_changed_tables_are_converted(self):
+        tables = IncrementalTables(self.configuration, self.data)
+        before = dict(tables.tables)
+        # A second run of a model which already has a comparison
+        first = tables.elements.df.iloc[0]
+        rows = self.data[
+            (self.data["AUTHOR"] == first["S1_AUTHOR"])
+            & (self.data["COUNTRY"] == first["S1_COUNTRY"])
+            & (self.data["INTERVENTION"] == first["S1_INTERVENTION"])
+            & (self.data["SCENARIO"] == 0)
+        ].iloc[:1]
+        converted = tables.update(rows)
+
+        assert 0 < len(converted) <= len(self.configuration["groups"])
+        for key, table in tables.tables.items():
+            if key not in converted:
+                assert table is before[key]
+        data = pd.concat([self.data, rows])
+        assert tables.tables == create_tables(self.configuration, data)
+
+    def test_unmatched_rows_change_nothing(self):
+        configuration = {**self.configuration, "filters": {"author": [0]}}
+        tables = IncrementalTables(configuration, self.data)
+        rows = self.rows[self.rows["AUTHOR"] != 0]
+        assert tables.update(rows) == []
+
+    def test_without_groups(self):
+        configuration = {**self.configuration, "data_format": "dataframe"}
+        del configuration["groups"]
+        tables = IncrementalTables(configuration, self.data)
+        assert tables.update(self.rows) == ["comparisons"]
+        expected = create_tables(configuration, self.mock_data)
+        pd.testing.assert_frame_equal(tables.tables, expected)
+
+    def test_several_pairs_match_full_run(self):
+        data = pd.concat([
+            self.mock_data,
+            self.mock_data[self.mock_data["SCENARIO"] == 1].assign(SCENARIO=2),
+        ]).reset_index(drop=True)
+        configuration = {
+            **self.configuration,
+            "scenarios": [0, 1, 2],
+            "pairing": "all_pairs",
+        }
+        tables = IncrementalTables(configuration, data.iloc[:1500])
+        tables.update(data.iloc[1500:])
+        assert tables.tables == create_tables(configuration, data)
@@ -0,0 +1,28 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons.datatypes import Filter
+from src.botech_comparisons.ingest import read_records
+from src.botech_comparisons.records import create_records
+warnings.filterwarnings("ignore")
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.mock_data_filepath = "./tests/MOCK_DATA.csv"
+        self.mock_data = pd.read_csv(self.mock_data_filepath, keep_default_na=False)
+
+    def test_chunks_match_dataframe(self):
+        streamed = read_records(self.mock_data_filepath, chunksize=77)
+        assert streamed.to_records() == create_records(self.mock_data).to_records()
+
+    def test_chunks_are_filtered(self):
+        scenarios = (0, 1)
+        filters = {Filter.INCOME: ["Low income"], Filter.INTERVENTION: [0]}
+        streamed = read_records(self.mock_data_filepath, scenarios, filters, chunksize=50)
+        expected = create_records(self.mock_data, scenarios, filters)
+        assert streamed.to_records() == expected.to_records()
+
+    def test_nothing_selected(self):
+        streamed = read_records(self.mock_data_filepath, ("NOT A SCENARIO",))
+        assert len(streamed) == 0
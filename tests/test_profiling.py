@@ -0,0 +1,36 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons import PipelineStats, create_tables
+warnings.filterwarnings("ignore")
+
+
+class TestPipelineStats(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.configuration = {
+            "data_type": "comparisons",
+            "data_format": "csv",
+            "scenarios": [0, 1],
+            "latest_only": True,
+            "groups": [["region"]],
+        }
+
+    def test_every_stage_is_measured(self):
+        stats = PipelineStats()
+        result = create_tables(self.configuration, self.mock_data, stats=stats)
+        assert result == create_tables(self.configuration, self.mock_data)
+
+        stages = {stage.stage: stage for stage in stats.stages}
+        assert list(stages) == ["records", "select_latest", "comparisons", "group", "format"]
+        assert stages["records"].rows_in == len(self.mock_data)
+        assert stages["comparisons"].rows_in == stages["select_latest"].rows_out
+        assert all(stage.peak_bytes > 0 for stage in stats.stages)
+        assert "total" in stats.report()
+
+    def test_callback(self):
+        seen = []
+        stats = PipelineStats(callback=seen.append, memory=False)
+        create_tables(self.configuration, self.mock_data, stats=stats)
+        assert seen == stats.stages
+        assert all(stage.peak_bytes is None for stage in seen)
@@ -0,0 +1,71 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons.datatypes import Filter
+from src.botech_comparisons.records import (
+    create_records,
+    filter_records,
+    select_latest_records,
+)
+from src.botech_comparisons.tables import RecordTable
+warnings.filterwarnings("ignore")
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.scenarios = (0, 1)
+        self.filters = {
+            Filter.INCOME: ["Low income", "High income"],
+            Filter.AUTHOR: [0, 1, 2, 3, 4],
+            Filter.INTERVENTION: [0],
+        }
+
+    def test_table_filter_matches_record_filter(self):
+        table = create_records(self.mock_data)
+        by_table = filter_records(table, self.scenarios, self.filters)
+        by_list = filter_records(table.to_records(), self.scenarios, self.filters)
+        assert isinstance(by_table, RecordTable)
+        assert by_table.to_records() == by_list
+
+    def test_filters_pushed_down(self):
+        table = create_records(self.mock_data)
+        filtered = filter_records(table, self.scenarios, self.filters)
+        pushed_down = create_records(self.mock_data, self.scenarios, self.filters)
+        assert pushed_down.to_records() == filtered.to_records()
+
+    def test_scenarios_only(self):
+        pushed_down = create_records(self.mock_data, (1,))
+        assert set(pushed_down.df["SCENARIO"]) == {1}
+
+    def test_select_latest_records(self):
+        data = pd.DataFrame({
+            "AUTHOR": [1, 1, 1, 1, 2],
+            "COUNTRY": ["BR", "BR", "BR", "BR", "MZ"],
+            "INTERVENTION": [0, 0, 0, 0, 0],
+            "SCENARIO": [0, 0, 1, 1, 0],
+            "TIMESTAMP": ["2023-01-01", "2023-03-01", "2023-02-01", "2023-01-01", "2023-01-01"],
+            "EFFECTS": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "COSTS": [1.0, 2.0, 3.0, 4.0, 5.0],
+        })
+        latest = select_latest_records(create_records(data), self.scenarios)
+        assert latest.df["EFFECTS"].tolist() == [2.0, 3.0]
+
+        unpaired = select_latest_records(create_records(data), self.scenarios, remove_unpaired=False)
+        assert unpaired.df["EFFECTS"].tolist() == [2.0, 3.0, 5.0]
+
+    def test_select_latest_records_with_pairing(self):
+        data = pd.DataFrame({
+            "AUTHOR": [1, 1, 2, 2, 3],
+            "COUNTRY": ["BR"] * 5,
+            "INTERVENTION": [0] * 5,
+            "SCENARIO": [0, 2, 1, 2, 0],
+            "TIMESTAMP": ["2023-01-01"] * 5,
+            "EFFECTS": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "COSTS": [1.0] * 5,
+        })
+        records = create_records(data)
+        reference = select_latest_records(records, (0, 1, 2), pairing="reference")
+        assert reference.df["EFFECTS"].tolist() == [1.0, 2.0]
+        all_pairs = select_latest_records(records, (0, 1, 2), pairing="all_pairs")
+        assert all_pairs.df["EFFECTS"].tolist() == [1.0, 2.0, 3.0, 4.0]
@@ -0,0 +1,118 @@
+import warnings
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import pandas as pd
+import unittest
+from unittest import mock
+from src.botech_comparisons import create_tables
+from src.botech_comparisons.datatypes import Summary
+from src.botech_comparisons.server import TableServer
+warnings.filterwarnings("ignore")
+
+
+class TestTableServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_filepath = os.path.join(self.directory.name, "data.csv")
+        shutil.copy("./tests/MOCK_DATA.csv", self.data_filepath)
+        self.configuration = {
+            "data_type": "comparisons",
+            "data_format": "csv",
+            "scenarios": [0, 1],
+            "groups": [["region"]],
+        }
+        self.server = TableServer(self.data_filepath, poll_interval=0.05)
+        self.listener = await self.server.start(path=os.path.join(self.directory.name, "socket"))
+        self.reader, self.writer = await asyncio.open_unix_connection(
+            os.path.join(self.directory.name, "socket")
+        )
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.listener.close()
+        await self.listener.wait_closed()
+        self.server.close()
+        self.directory.cleanup()
+
+    async def request(self, configuration: dict) -> dict:
+        self.writer.write(json.dumps(configuration).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def test_matches_create_tables(self):
+        expected = create_tables(self.configuration, self.data_filepath)
+        assert (await self.request(self.configuration))["result"] == expected
+        assert (await self.request(self.configuration))["result"] == expected
+        statistics = (await self.request({"command": "statistics"}))["result"]
+        assert statistics["requests"] == 2
+        assert statistics["cache"]["hits"] == 1
+
+    async def test_errors_are_reported(self):
+        response = await self.request({**self.configuration, "data_type": "unknown"})
+        assert "Unknown data type" in response["error"]
+        # The connection is still usable
+        assert "result" in await self.request(self.configuration)
+
+    async def test_unserializable_results_are_reported(self):
+        class Unprintable:
+            def __str__(self):
+                raise TypeError("Unprintable")
+        result = {"value": Unprintable()}
+        with mock.patch.object(self.server, "create_tables", return_value=result):
+            response = await self.request(self.configuration)
+        assert response["error"] == "TypeError: Unprintable"
+        assert "result" in await self.request(self.configuration)
+
+    async def test_non_finite_floats_are_null(self):
+        summary = Summary(
+            "REGION", "Total", 0, 1, 1, 1.0, 1.0, 2.0, 1.0, 1.0, 0.0,
+            float("inf"), float("-inf"), float("nan"), float("inf")
+        )
+        with mock.patch.object(self.server, "create_tables", return_value=[summary]):
+            self.writer.write(json.dumps(self.configuration).encode("utf-8") + b"\n")
+            await self.writer.drain()
+            line = await self.reader.readline()
+
+        def reject(constant):
+            raise ValueError(f"Not JSON: {constant}")
+        result = json.loads(line, parse_constant=reject)["result"]
+        assert result[0]["COST_EFFECTIVENESS"] is None
+        assert result[0]["MEDIAN_COST_EFFECTIVENESS"] is None
+        assert result[0]["NET_EFFECTS"] == 1.0
+
+    async def test_reload_recovers_from_a_bad_file(self):
+        data = pd.read_csv(self.data_filepath, keep_default_na=False)
+        # Half written: the header is there, but not every column
+        data[["AUTHOR", "COUNTRY"]].to_csv(self.data_filepath, index=False)
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if self.server.reload_errors:
+                break
+        assert self.server.reload_errors and self.server.reloads == 1
+        # Still serving the data which was loaded
+        expected = create_tables(self.configuration, "./tests/MOCK_DATA.csv")
+        assert (await self.request(self.configuration))["result"] == expected
+
+        data.iloc[:100].to_csv(self.data_filepath, index=False)
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if self.server.reloads == 2:
+                break
+        assert self.server.reloads == 2
+        expected = create_tables(self.configuration, self.data_filepath)
+        assert (await self.request(self.configuration))["result"] == expected
+
+    async def test_reloads_changed_data(self):
+        data = pd.read_csv(self.data_filepath, keep_default_na=False)
+        data.iloc[:100].to_csv(self.data_filepath, index=False)
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if self.server.reloads == 2:
+                break
+        expected = create_tables(self.configuration, self.data_filepath)
+        assert self.server.reloads == 2
+        assert (await self.request(self.configuration))["result"] == expected
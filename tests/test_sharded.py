@@ -0,0 +1,76 @@
+import warnings
+import pandas as pd
+import unittest
+from unittest import mock
+from src.botech_comparisons import _prepare_elements, create_tables
+from src.botech_comparisons import sharded
+from src.botech_comparisons.records import create_records
+warnings.filterwarnings("ignore")
+
+
+@mock.patch.object(sharded, "MIN_ROWS_PER_SHARD", 1)
+class TestSharded(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.configuration = {
+            "data_type": "comparisons",
+            "data_format": "csv",
+            "scenarios": [0, 1],
+            "latest_only": True,
+            "groups": [["region"], ["income", "region"]],
+        }
+
+    def test_matches_single_process(self):
+        for data_type in ["records", "comparisons", "summaries"]:
+            configuration = {**self.configuration, "data_type": data_type}
+            expected = create_tables(configuration, self.mock_data)
+            result = create_tables({**configuration, "shards": 3}, self.mock_data)
+            assert result == expected
+
+    def test_elements_keep_their_index(self):
+        records = create_records(self.mock_data).take(list(range(0, len(self.mock_data), 2)))
+        for data in [self.mock_data, records]:
+            for data_type in ["records", "comparisons"]:
+                configuration = {
+                    **self.configuration,
+                    "data_type": data_type,
+                    "filters": {"income": ["Low income", "High income"]},
+                }
+                expected, _, _ = _prepare_elements(configuration, data)
+                result, _, _ = _prepare_elements({**configuration, "shards": 4}, data)
+                pd.testing.assert_frame_equal(result.df, expected.df)
+
+    def test_missing_values(self):
+        data = self.mock_data.assign(
+            UID=pd.array(
+                [None if i % 3 else f"u{i}" for i in range(len(self.mock_data))],
+                dtype="string"
+            ),
+            TIMESTAMP=pd.Categorical(
+                self.mock_data["TIMESTAMP"].where(self.mock_data.index % 4 > 0)
+            ),
+        )
+        for data_type in ["records", "comparisons"]:
+            configuration = {**self.configuration, "data_type": data_type, "latest_only": False}
+            expected, _, _ = _prepare_elements(configuration, data)
+            result, _, _ = _prepare_elements({**configuration, "shards": 3}, data)
+            pd.testing.assert_frame_equal(result.df, expected.df)
+        assert result.df["S1_UID"].isna().sum() == expected.df["S1_UID"].isna().sum() > 0
+
+    def test_several_pairs(self):
+        data = pd.concat([
+            self.mock_data,
+            self.mock_data[self.mock_data["SCENARIO"] == 1].assign(SCENARIO=2),
+        ]).reset_index(drop=True)
+        configuration = {
+            **self.configuration,
+            "scenarios": [0, 1, 2],
+            "pairing": "all_pairs",
+        }
+        expected = create_tables(configuration, data)
+        assert create_tables({**configuration, "shards": 2}, data) == expected
+
+    def test_no_matching_records(self):
+        configuration = {**self.configuration, "filters": {"author": ["nobody"]}, "shards": 2}
+        with self.assertRaises(ValueError):
+            create_tables(configuration, self.mock_data)
@@ -0,0 +1,51 @@
+import warnings
+import json
+import os
+import tempfile
+import zipfile
+import pandas as pd
+import unittest
+from src.botech_comparisons import create_tables, iter_tables, write_tables
+warnings.filterwarnings("ignore")
+
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        with open("./tests/configuration_with_everything.json", "r") as f:
+            self.configuration = json.load(f)
+        self.configuration["data_type"] = "records"
+        self.configuration["data_format"] = "csv"
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.expected = create_tables(self.configuration, self.mock_data)
+
+    def test_iter_tables(self):
+        tables = iter_tables(self.configuration, self.mock_data)
+        assert dict(tables) == self.expected
+
+    def test_iter_tables_without_groups(self):
+        configuration = {**self.configuration, "groups": []}
+        tables = list(iter_tables(configuration, self.mock_data))
+        assert tables == [("records", create_tables(configuration, self.mock_data))]
+
+    def test_write_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepaths = write_tables(self.configuration, self.mock_data, directory)
+            assert len(filepaths) == len(self.expected)
+            for filepath, table in zip(filepaths, self.expected.values()):
+                with open(filepath, encoding="utf-8", newline="") as f:
+                    assert f.read() == table
+
+    def test_write_zip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "tables.zip")
+            names = write_tables(self.configuration, self.mock_data, filepath)
+            with zipfile.ZipFile(filepath) as archive:
+                assert archive.namelist() == names
+                for name, table in zip(names, self.expected.values()):
+                    assert archive.read(name).decode("utf-8") == table
+
+    def test_unwritable_format(self):
+        configuration = {**self.configuration, "data_format": "dataframe"}
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                write_tables(configuration, self.mock_data, directory)
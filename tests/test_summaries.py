@@ -0,0 +1,96 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons import create_tables
+from src.botech_comparisons.datatypes import Summary
+from src.botech_comparisons.tables import SUMMARY_COLUMNS
+warnings.filterwarnings("ignore")
+
+
+class TestSummaries(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+        self.configuration = {
+            "data_type": "summaries",
+            "data_format": "dataframe",
+            "scenarios": [0, 1],
+            "groups": [["region"], ["income", "region"]],
+        }
+        self.comparisons = create_tables(
+            {**self.configuration, "data_type": "comparisons", "groups": [["region"]]},
+            self.mock_data
+        )
+
+    def test_one_table_per_group(self):
+        summaries = create_tables(self.configuration, self.mock_data)
+        assert list(summaries) == ["REGION", "INCOME, REGION"]
+        for summary in summaries.values():
+            assert list(summary.columns) == SUMMARY_COLUMNS
+            assert summary["COUNT"].sum() == sum(len(df) for df in self.comparisons.values())
+
+    def test_matches_grouped_comparisons(self):
+        summary = create_tables(self.configuration, self.mock_data)["REGION"]
+        for _, row in summary.iterrows():
+            comparisons = self.comparisons[f"REGION_{row['CELL']}"]
+            assert row["COUNT"] == len(comparisons)
+            self.assertAlmostEqual(row["NET_COSTS"], comparisons["NET_COSTS"].sum())
+            self.assertAlmostEqual(row["COST_EFFECTIVENESS"], (
+                comparisons["NET_EFFECTS"].sum() / comparisons["NET_COSTS"].sum()
+            ))
+            assert row["MEDIAN_COST_EFFECTIVENESS"] == comparisons["COST_EFFECTIVENESS"].median()
+
+    def test_rollup(self):
+        summaries = create_tables({**self.configuration, "rollup": True}, self.mock_data)
+        by_region = create_tables(self.configuration, self.mock_data)["REGION"]
+        summary = summaries["INCOME, REGION"]
+        total = summary[summary["CELL"] == "Total, Total"]
+        assert len(total) == 1
+        assert total["COUNT"].item() == by_region["COUNT"].sum()
+        self.assertAlmostEqual(total["NET_COSTS"].item(), by_region["NET_COSTS"].sum())
+        assert summaries["REGION"]["CELL"].tolist() == by_region["CELL"].tolist() + ["Total"]
+        subtotals = summary[summary["CELL"].str.endswith(", Total")]
+        assert subtotals["COUNT"].sum() == 2 * by_region["COUNT"].sum()
+
+    def test_pairs_are_summarised_apart(self):
+        data = pd.concat([
+            self.mock_data,
+            self.mock_data[self.mock_data["SCENARIO"] == 1].assign(
+                SCENARIO=2, COSTS=lambda df: df["COSTS"] * 2
+            ),
+        ]).reset_index(drop=True)
+        configuration = {
+            **self.configuration,
+            "scenarios": [0, 1, 2],
+            "pairing": "reference",
+            "rollup": True,
+        }
+        summary = create_tables(configuration, data)["REGION"]
+        assert list(zip(summary["S1_SCENARIO"], summary["S2_SCENARIO"])) == sorted(
+            zip(summary["S1_SCENARIO"], summary["S2_SCENARIO"])
+        )
+        by_region = create_tables(self.configuration, self.mock_data)["REGION"]
+        for scenario in [1, 2]:
+            pair = summary[summary["S2_SCENARIO"] == scenario]
+            assert (pair["S1_SCENARIO"] == 0).all()
+            assert pair["CELL"].tolist() == by_region["CELL"].tolist() + ["Total"]
+            assert pair["COUNT"].tolist()[:-1] == by_region["COUNT"].tolist()
+        one = summary[summary["S2_SCENARIO"] == 1].reset_index(drop=True)
+        pd.testing.assert_frame_equal(
+            one.iloc[:-1].drop(columns=["S1_SCENARIO", "S2_SCENARIO"]),
+            by_region.drop(columns=["S1_SCENARIO", "S2_SCENARIO"]),
+            check_dtype=False
+        )
+
+    def test_without_groups(self):
+        configuration = {**self.configuration}
+        del configuration["groups"]
+        summary = create_tables(configuration, self.mock_data)
+        assert len(summary) == 1
+        assert summary["CELL"].tolist() == ["Total"]
+
+    def test_every_format(self):
+        for data_format in ["csv", "html"]:
+            summaries = create_tables({**self.configuration, "data_format": data_format}, self.mock_data)
+            assert isinstance(summaries["REGION"], str)
+        summaries = create_tables({**self.configuration, "data_format": "self"}, self.mock_data)
+        assert all(isinstance(summary, Summary) for summary in summaries["REGION"])
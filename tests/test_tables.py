@@ -0,0 +1,31 @@
+import warnings
+import pandas as pd
+import unittest
+from src.botech_comparisons.datatypes import Record
+from src.botech_comparisons.records import create_records
+from src.botech_comparisons.tables import RECORD_COLUMNS, RecordTable
+warnings.filterwarnings("ignore")
+
+
+class TestRecordTable(unittest.TestCase):
+    def setUp(self):
+        self.mock_data = pd.read_csv("./tests/MOCK_DATA.csv", keep_default_na=False)
+
+    def test_create_records_returns_table(self):
+        table = create_records(self.mock_data)
+        assert isinstance(table, RecordTable)
+        assert len(table) == len(self.mock_data)
+        assert list(table.df.columns) == RECORD_COLUMNS
+
+    def test_tags_match_records(self):
+        table = create_records(self.mock_data.head(50))
+        for record, (_, row) in zip(table, table.df.iterrows()):
+            assert isinstance(record, Record)
+            assert record.REGION == row["REGION"]
+            assert record.INCOME == row["INCOME"]
+            assert record.APPENDIX_3 == row["APPENDIX_3"]
+
+    def test_records_keep_input_order(self):
+        table = create_records(self.mock_data)
+        countries = [record.COUNTRY for record in table.to_records()]
+        assert countries == self.mock_data["COUNTRY"].tolist()